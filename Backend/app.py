@@ -1,14 +1,20 @@
+import asyncio
+import hashlib
+import json
 import os
 # import smtplib
+import sqlite3
 import subprocess
 import sys
 # from email.mime.text import MIMEText
 # from email.mime.multipart import MIMEMultipart
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from dotenv import load_dotenv
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request
 from flask_cors import CORS
 import threading
+import time
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
@@ -17,68 +23,192 @@ from email.mime.multipart import MIMEMultipart
 env_path = Path(__file__).parent.parent / '.env'
 load_dotenv(env_path)
 
+# Resolve paths and env lookups once at import time instead of per call
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+MOTION_SCRIPT_PATH = os.path.join(BACKEND_DIR, 'motion_detect_pose.py')
+GMAIL_EMAIL = os.environ.get('GMAIL_EMAIL')
+GMAIL_APP_PASSWORD = os.environ.get('GMAIL_APP_PASSWORD')
+# MOTION_ALERT_EMAIL accepts a comma-separated list of recipients
+MOTION_ALERT_EMAILS = [e.strip() for e in
+                       os.environ.get('MOTION_ALERT_EMAIL', 'your@email.com').split(',')
+                       if e.strip()]
+
 app = Flask(__name__)
 CORS(app)
 
 # Motion detection state
 motion_detected_flag = threading.Event()
 
-def send_motion_email(to_email, subject, message):
+# Bounded worker pool for background jobs - an unbounded thread-per-request
+# pattern lets a misbehaving client exhaust memory with idle threads
+_background_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='backend-worker')
+
+# Persistent SMTP connection - reused across alerts instead of reconnecting per email
+_smtp_connection = None
+_smtp_lock = threading.Lock()
+
+def _get_smtp_connection(gmail_email, gmail_password):
+    """Get a logged-in SMTP connection, reusing the existing one when alive."""
+    global _smtp_connection
+    if _smtp_connection is not None:
+        try:
+            _smtp_connection.noop()
+            return _smtp_connection
+        except Exception:
+            # Connection went stale (Gmail drops idle sessions) - reconnect
+            try:
+                _smtp_connection.quit()
+            except Exception:
+                pass
+            _smtp_connection = None
+    server = smtplib.SMTP("smtp.gmail.com", 587)
+    server.starttls()
+    server.login(gmail_email, gmail_password)
+    _smtp_connection = server
+    return _smtp_connection
+
+def send_motion_email(to_emails, subject, message):
+    """Send a motion alert to one or more recipients over a single SMTP session."""
+    global _smtp_connection
+    if isinstance(to_emails, str):
+        to_emails = [to_emails]
     try:
-        gmail_email = os.environ.get('GMAIL_EMAIL')
-        gmail_password = os.environ.get('GMAIL_APP_PASSWORD')
+        gmail_email = GMAIL_EMAIL
+        gmail_password = GMAIL_APP_PASSWORD
         if gmail_email and gmail_password:
-            msg = MIMEMultipart('alternative')
-            msg['Subject'] = subject
-            msg['From'] = gmail_email
-            msg['To'] = to_email
-            html_part = MIMEText(message, 'html')
-            msg.attach(html_part)
-            server = smtplib.SMTP("smtp.gmail.com", 587)
-            server.starttls()
-            server.login(gmail_email, gmail_password)
-            server.send_message(msg)
-            server.quit()
-            print(f"✅ Motion alert email sent to: {to_email}")
+            messages = []
+            for to_email in to_emails:
+                msg = MIMEMultipart('alternative')
+                msg['Subject'] = subject
+                msg['From'] = gmail_email
+                msg['To'] = to_email
+                html_part = MIMEText(message, 'html')
+                msg.attach(html_part)
+                messages.append(msg)
+            with _smtp_lock:
+                try:
+                    server = _get_smtp_connection(gmail_email, gmail_password)
+                    for msg in messages:
+                        server.send_message(msg)
+                except smtplib.SMTPServerDisconnected:
+                    # Retry once on a fresh connection
+                    _smtp_connection = None
+                    server = _get_smtp_connection(gmail_email, gmail_password)
+                    for msg in messages:
+                        server.send_message(msg)
+            print(f"✅ Motion alert email sent to: {', '.join(to_emails)}")
             return True
         else:
-            print(f"📝 Would send motion alert to: {to_email}")
+            print(f"📝 Would send motion alert to: {', '.join(to_emails)}")
             return False
     except Exception as e:
         print(f"❌ Failed to send motion alert email: {e}")
         return False
 
-# Threaded function to run motion_detect_pose.py
-def run_motion_detection():
-    script_path = os.path.join(os.path.dirname(__file__), 'motion_detect_pose.py')
-    process = subprocess.Popen([sys.executable, script_path], stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+# Cooldown between motion alert emails - the detector can fire many times per
+# second, but one email per burst is enough
+MOTION_EMAIL_COOLDOWN = int(os.environ.get('MOTION_EMAIL_COOLDOWN', '60'))  # seconds
+_last_motion_email_time = 0.0
+
+def _should_send_motion_email():
+    """Debounce motion alert emails so bursts of detections send one email."""
+    global _last_motion_email_time
+    now = time.monotonic()
+    if now - _last_motion_email_time < MOTION_EMAIL_COOLDOWN:
+        return False
+    _last_motion_email_time = now
+    return True
+
+# Stream buffer for the detector's stdout - the default 64KB limit is easy to
+# overrun when the detector prints a detection line per frame, and a bigger
+# buffer means fewer reads to drain the pipe
+MOTION_PIPE_BUFFER = 1024 * 1024  # 1MB
+
+# Detection lines from motion_detect_pose.py always begin with this marker
+_DETECTION_PREFIX = '🎯 Detection:'.encode('utf-8')
+
+async def _stream_motion_detection():
+    """Spawn motion_detect_pose.py and consume its stdout without blocking reads."""
+    process = await asyncio.create_subprocess_exec(
+        sys.executable, MOTION_SCRIPT_PATH,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.DEVNULL,
+        limit=MOTION_PIPE_BUFFER
+    )
     while True:
-        line = process.stdout.readline()
-        if not line:
+        raw_line = await process.stdout.readline()
+        if not raw_line:
             break
-        if '🎯 Detection:' in line:
-            print('Motion detected:', line.strip())
-            motion_detected_flag.set()
-            # Send email (customize recipient)
+        # Fast path: detection lines always start with the prefix, so test the
+        # raw bytes and skip decoding the (far more common) non-detection lines
+        if not raw_line.startswith(_DETECTION_PREFIX):
+            continue
+        line = raw_line.decode('utf-8', errors='replace')
+        print('Motion detected:', line.strip())
+        motion_detected_flag.set()
+        # Send email (customize recipient), debounced to one per cooldown window
+        if _should_send_motion_email():
             send_motion_email(
-                to_email=os.environ.get('MOTION_ALERT_EMAIL', 'your@email.com'),
+                to_emails=MOTION_ALERT_EMAILS,
                 subject='Motion Detected!',
                 message=f'<h2>Motion detected in Outdoor Mode!</h2><pre>{line.strip()}</pre>'
             )
-    process.wait()
+    await process.wait()
+
+# Threaded function to run motion_detect_pose.py
+def run_motion_detection():
+    asyncio.run(_stream_motion_detection())
+
+# Only one motion detection subprocess should run at a time
+_motion_future = None
+_motion_lock = threading.Lock()
 
 @app.route('/motion-detect', methods=['POST'])
 def motion_detect():
-    # Start motion detection in a thread
-    motion_detected_flag.clear()
-    t = threading.Thread(target=run_motion_detection, daemon=True)
-    t.start()
+    global _motion_future
+    # Run motion detection on the worker pool, unless one is already running
+    with _motion_lock:
+        if _motion_future is not None and not _motion_future.done():
+            return jsonify({'status': 'already_running'}), 200
+        motion_detected_flag.clear()
+        _motion_future = _background_executor.submit(run_motion_detection)
     return jsonify({'status': 'started'}), 200
 
+# Both possible /motion-status bodies, serialized once - the endpoint is
+# polled continuously so there's no point re-encoding the same JSON per request
+_MOTION_STATUS_TRUE = b'{"motion_detected": true}'
+_MOTION_STATUS_FALSE = b'{"motion_detected": false}'
+
 @app.route('/motion-status', methods=['GET'])
 def motion_status():
-    detected = motion_detected_flag.is_set()
-    return jsonify({'motion_detected': detected}), 200
+    body = _MOTION_STATUS_TRUE if motion_detected_flag.is_set() else _MOTION_STATUS_FALSE
+    return Response(body, mimetype='application/json'), 200
+
+@app.route('/motion-status/stream', methods=['GET'])
+def motion_status_stream():
+    """Push motion status changes over Server-Sent Events.
+
+    Lets the frontend subscribe once instead of polling /motion-status;
+    events are only emitted when the state actually flips."""
+    def event_stream():
+        last_state = motion_detected_flag.is_set()
+        yield f'data: {{"motion_detected": {str(last_state).lower()}}}\n\n'
+        since_heartbeat = 0.0
+        while True:
+            state = motion_detected_flag.is_set()
+            if state != last_state:
+                last_state = state
+                since_heartbeat = 0.0
+                yield f'data: {{"motion_detected": {str(state).lower()}}}\n\n'
+            else:
+                time.sleep(0.25)
+                since_heartbeat += 0.25
+                if since_heartbeat >= 15.0:
+                    # Comment line keeps proxies from closing the idle stream
+                    since_heartbeat = 0.0
+                    yield ': keep-alive\n\n'
+    return Response(event_stream(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache'})
 
 # Lazy import weather_monitor to speed up startup
 weather_monitor = None
@@ -91,8 +221,17 @@ def get_weather_monitor():
         weather_monitor = wm
     return weather_monitor
 
-# Import and start automatic monitoring
-from automatic_monitoring import automatic_monitor
+# Lazy import automatic_monitoring - constructing the monitor connects to
+# Firebase, which shouldn't happen until a monitoring endpoint is actually hit
+automatic_monitor = None
+
+def get_automatic_monitor():
+    """Lazy load the automatic monitor to avoid Firebase init at startup"""
+    global automatic_monitor
+    if automatic_monitor is None:
+        from automatic_monitoring import automatic_monitor as am
+        automatic_monitor = am
+    return automatic_monitor
 
 
 # Core email functionality - DISABLED
@@ -118,17 +257,113 @@ def send_email():
         return jsonify({'error': str(exc)}), 500
 
 
+# Short-lived cache for weather endpoints - weather barely changes minute to
+# minute, so repeat requests from the dashboard shouldn't hit the upstream API
+WEATHER_CACHE_TTL = int(os.environ.get('WEATHER_CACHE_TTL', '60'))  # seconds
+_weather_cache = {}
+_weather_cache_lock = threading.Lock()
+
+# On-disk layer under the in-memory cache, so a worker restart (or a fresh
+# gunicorn fork) starts warm instead of hammering the weather API
+WEATHER_CACHE_DB = os.path.join(BACKEND_DIR, 'weather_cache.db')
+
+def _load_weather_cache_from_disk(cache_key):
+    """Read a still-fresh cached payload from SQLite, or None."""
+    try:
+        with sqlite3.connect(WEATHER_CACHE_DB) as conn:
+            row = conn.execute(
+                'SELECT body, etag, fetched_at FROM weather_cache WHERE key = ?',
+                (repr(cache_key),)
+            ).fetchone()
+        if row and time.time() - row[2] < WEATHER_CACHE_TTL:
+            return row[0], row[1], row[2]
+    except sqlite3.Error:
+        pass
+    return None
+
+def _save_weather_cache_to_disk(cache_key, body, etag):
+    """Best-effort persist of a cached payload - cache writes must never fail a request."""
+    try:
+        with sqlite3.connect(WEATHER_CACHE_DB) as conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS weather_cache '
+                '(key TEXT PRIMARY KEY, body BLOB, etag TEXT, fetched_at REAL)'
+            )
+            conn.execute(
+                'INSERT OR REPLACE INTO weather_cache VALUES (?, ?, ?, ?)',
+                (repr(cache_key), body, etag, time.time())
+            )
+    except sqlite3.Error as e:
+        print(f"⚠️ Could not persist weather cache: {e}")
+
+# Per-key fetch locks for single-flight misses - when several requests miss
+# the cache at once, only one should call the weather API
+_weather_fetch_locks = {}
+
+def _get_fetch_lock(cache_key):
+    with _weather_cache_lock:
+        lock = _weather_fetch_locks.get(cache_key)
+        if lock is None:
+            lock = _weather_fetch_locks[cache_key] = threading.Lock()
+    return lock
+
+def _get_cached_weather(cache_key, fetch):
+    """Return (body, etag) for cache_key, refetching once the TTL expires."""
+    now = time.monotonic()
+    with _weather_cache_lock:
+        entry = _weather_cache.get(cache_key)
+        if entry and entry[0] > now:
+            return entry[1], entry[2]
+    with _get_fetch_lock(cache_key):
+        # Another request may have completed the fetch while we waited
+        now = time.monotonic()
+        with _weather_cache_lock:
+            entry = _weather_cache.get(cache_key)
+            if entry and entry[0] > now:
+                return entry[1], entry[2]
+        cached = _load_weather_cache_from_disk(cache_key)
+        if cached:
+            body, etag, fetched_at = cached
+            # Promote with only the disk entry's remaining freshness - a
+            # full fresh TTL here would serve up to 2x TTL stale
+            expiry = now + (WEATHER_CACHE_TTL - (time.time() - fetched_at))
+        else:
+            data = fetch()
+            body = json.dumps(data).encode('utf-8')
+            etag = hashlib.md5(body).hexdigest()
+            _save_weather_cache_to_disk(cache_key, body, etag)
+            expiry = now + WEATHER_CACHE_TTL
+        with _weather_cache_lock:
+            _weather_cache[cache_key] = (expiry, body, etag)
+        return body, etag
+
+def _weather_response(cache_key, fetch):
+    """Serve a cached weather payload, short-circuiting with 304 on ETag match."""
+    body, etag = _get_cached_weather(cache_key, fetch)
+    if etag in request.if_none_match:
+        response = Response(status=304)
+    else:
+        response = Response(body, mimetype='application/json')
+    response.set_etag(etag)
+    return response
+
+
 # Weather API endpoints
 @app.route("/weather/current", methods=["GET"])
 def get_current_weather():
     try:
         city = request.args.get('city')
         country = request.args.get('country')
-        
+
         wm = get_weather_monitor()
-        weather_data = wm.get_current_weather(city, country)
-        return jsonify(weather_data), 200
-        
+        # WeatherMonitor serves its configured location regardless of the
+        # query args, so the cache key must not vary with user input -
+        # otherwise arbitrary ?city= strings leak a lock and cache row each
+        return _weather_response(
+            ('current',),
+            lambda: wm.get_current_weather(city, country)
+        )
+
     except Exception as exc:
         print(f"Error getting weather: {exc}")
         return jsonify({'error': str(exc)}), 500
@@ -139,11 +374,14 @@ def get_weather_forecast():
     try:
         city = request.args.get('city')
         country = request.args.get('country')
-        
+
         wm = get_weather_monitor()
-        forecast_data = wm.get_weather_forecast(city, country)
-        return jsonify(forecast_data), 200
-        
+        # Same single-location normalization as /weather/current
+        return _weather_response(
+            ('forecast',),
+            lambda: wm.get_weather_forecast(city, country)
+        )
+
     except Exception as exc:
         print(f"Error getting forecast: {exc}")
         return jsonify({'error': str(exc)}), 500
@@ -279,7 +517,7 @@ def health():
 def start_monitoring():
     """Start automatic monitoring"""
     try:
-        result = automatic_monitor.start_monitoring()
+        result = get_automatic_monitor().start_monitoring()
         if result:
             return jsonify({'status': 'started', 'message': 'Automatic monitoring started'}), 200
         else:
@@ -292,7 +530,7 @@ def start_monitoring():
 def stop_monitoring():
     """Stop automatic monitoring"""
     try:
-        automatic_monitor.stop_monitoring()
+        get_automatic_monitor().stop_monitoring()
         return jsonify({'status': 'stopped', 'message': 'Automatic monitoring stopped'}), 200
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)}), 500
@@ -302,118 +540,117 @@ def stop_monitoring():
 def monitoring_status():
     """Get monitoring status"""
     try:
-        status = automatic_monitor.get_status()
+        status = get_automatic_monitor().get_status()
         return jsonify(status), 200
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
 
-@app.route("/monitoring/check-now", methods=["POST"])
-def check_now():
-    """Manually trigger monitoring checks"""
+def _run_manual_check():
+    """Run both monitoring checks on the worker pool."""
     try:
-        print("🔍 Manual monitoring check triggered")
-        automatic_monitor.check_soil_conditions()
-        automatic_monitor.check_weather_conditions()
-        return jsonify({'status': 'checked', 'message': 'Manual check completed'}), 200
+        monitor = get_automatic_monitor()
+        monitor.check_soil_conditions()
+        monitor.check_weather_conditions()
+        print("✅ Manual monitoring check complete")
     except Exception as e:
-        return jsonify({'status': 'error', 'message': str(e)}), 500
+        print(f"❌ Manual monitoring check failed: {e}")
 
 
-# GUI Mode endpoints
-@app.route("/modes/entertainment", methods=["POST"])
-def launch_entertainment_mode():
-    """Launch Entertainment Mode GUI"""
+@app.route("/monitoring/check-now", methods=["POST"])
+def check_now():
+    """Manually trigger monitoring checks"""
     try:
-        # Launch as a separate process
-        script_path = os.path.join(os.path.dirname(__file__), 'entertainment_mode.py')
-        process = subprocess.Popen([sys.executable, script_path], 
-                                 stdout=subprocess.PIPE, 
-                                 stderr=subprocess.PIPE)
-        return jsonify({
-            'status': 'launched', 
-            'message': 'Entertainment Mode GUI launched',
-            'mode': 'entertainment',
-            'process_id': process.pid
-        }), 200
+        print("🔍 Manual monitoring check triggered")
+        # The checks hit Firestore and the weather API - don't hold the
+        # request open for them, queue them on the worker pool instead
+        _background_executor.submit(_run_manual_check)
+        return jsonify({'status': 'queued', 'message': 'Manual check queued'}), 202
     except Exception as e:
-        print(f"Error launching entertainment mode: {e}")
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
 
-@app.route("/modes/casual", methods=["POST"])
-def launch_casual_mode():
-    """Launch Casual Mode GUI"""
+# GUI Mode endpoints - one data-driven launcher instead of a handler per mode
+GUI_MODES = {
+    'entertainment': {
+        'script': os.path.join(BACKEND_DIR, 'entertainment_mode.py'),
+        'message': 'Entertainment Mode GUI launched',
+        'start_automation': False
+    },
+    'casual': {
+        'script': os.path.join(BACKEND_DIR, 'casual_mode.py'),
+        'message': 'Casual Mode GUI launched',
+        'start_automation': False
+    },
+    'outdoor': {
+        'script': os.path.join(BACKEND_DIR, 'outdoor_mode.py'),
+        'message': 'Outdoor Mode GUI launched and automation started',
+        'start_automation': True
+    }
+}
+
+@app.route("/modes/<mode_name>", methods=["POST"])
+def launch_mode(mode_name):
+    """Launch a GUI mode as a separate process"""
+    mode = GUI_MODES.get(mode_name)
+    if mode is None:
+        return jsonify({'status': 'error', 'message': f'Unknown mode: {mode_name}'}), 404
     try:
-        # Launch as a separate process
-        script_path = os.path.join(os.path.dirname(__file__), 'casual_mode.py')
-        process = subprocess.Popen([sys.executable, script_path], 
-                                 stdout=subprocess.PIPE, 
+        process = subprocess.Popen([sys.executable, mode['script']],
+                                 stdout=subprocess.PIPE,
                                  stderr=subprocess.PIPE)
+        if mode['start_automation']:
+            # Start automation when Outdoor Mode is launched
+            monitor = get_automatic_monitor()
+            monitor.monitor_motion_and_alert(camera_index=0, motion_threshold=30)
+            monitor.start_monitoring()
         return jsonify({
-            'status': 'launched', 
-            'message': 'Casual Mode GUI launched',
-            'mode': 'casual',
+            'status': 'launched',
+            'message': mode['message'],
+            'mode': mode_name,
             'process_id': process.pid
         }), 200
     except Exception as e:
-        print(f"Error launching casual mode: {e}")
+        print(f"Error launching {mode_name} mode: {e}")
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
 
-@app.route("/modes/outdoor", methods=["POST"])
-def launch_outdoor_mode():
-    """Launch Outdoor Mode GUI"""
-    try:
-        # Launch as a separate process
-        script_path = os.path.join(os.path.dirname(__file__), 'outdoor_mode.py')
-        process = subprocess.Popen([sys.executable, script_path], 
-                                 stdout=subprocess.PIPE, 
-                                 stderr=subprocess.PIPE)
-        # Start automation when Outdoor Mode is launched
-        from automatic_monitoring import automatic_monitor
-        automatic_monitor.monitor_motion_and_alert(camera_index=0, motion_threshold=30)
-        automatic_monitor.start_monitoring()
-        return jsonify({
-            'status': 'launched', 
-            'message': 'Outdoor Mode GUI launched and automation started',
-            'mode': 'outdoor',
-            'process_id': process.pid
-        }), 200
-    except Exception as e:
-        print(f"Error launching outdoor mode: {e}")
-        return jsonify({'status': 'error', 'message': str(e)}), 500
-
+# /modes/list never changes, so serialize it once at import time
+_MODES_LIST_BODY = json.dumps({
+    'modes': [
+        {
+            'name': 'entertainment',
+            'title': 'Entertainment Mode',
+            'description': 'Interactive plant care games and challenges',
+            'endpoint': '/modes/entertainment'
+        },
+        {
+            'name': 'casual',
+            'title': 'Casual Mode',
+            'description': 'Simple plant care reminders and tips',
+            'endpoint': '/modes/casual'
+        },
+        {
+            'name': 'outdoor',
+            'title': 'Outdoor Mode',
+            'description': 'Advanced weather monitoring for outdoor plants',
+            'endpoint': '/modes/outdoor'
+        }
+    ]
+}).encode('utf-8')
 
 @app.route("/modes/list", methods=["GET"])
 def list_available_modes():
     """List all available GUI modes"""
-    return jsonify({
-        'modes': [
-            {
-                'name': 'entertainment',
-                'title': 'Entertainment Mode',
-                'description': 'Interactive plant care games and challenges',
-                'endpoint': '/modes/entertainment'
-            },
-            {
-                'name': 'casual',
-                'title': 'Casual Mode',
-                'description': 'Simple plant care reminders and tips',
-                'endpoint': '/modes/casual'
-            },
-            {
-                'name': 'outdoor',
-                'title': 'Outdoor Mode',
-                'description': 'Advanced weather monitoring for outdoor plants',
-                'endpoint': '/modes/outdoor'
-            }
-        ]
-    }), 200
+    return Response(_MODES_LIST_BODY, mimetype='application/json'), 200
 
 
 if __name__ == "__main__":
+    # Development entry point only - production runs under gunicorn
+    # (see start-backend.sh). Debug/reloader are opt-in: the reloader runs the
+    # whole module twice and the debugger adds per-request overhead.
     port = int(os.environ.get("PORT", "5001"))
-    app.run(host="0.0.0.0", port=port, debug=True)
+    debug = os.environ.get("FLASK_DEBUG", "0") == "1"
+    app.run(host="0.0.0.0", port=port, debug=debug, use_reloader=debug)
 
 
@@ -1,13 +1,22 @@
+import asyncio
+import functools
+import hashlib
+import logging
+import logging.handlers
 import os
+import queue
 import time
 import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from email.message import EmailMessage
-import mimetypes
+from string import Template
 import cv2
+import numpy as np
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -15,43 +24,381 @@ from dotenv import load_dotenv
 env_path = Path(__file__).parent.parent / '.env'
 load_dotenv(env_path)
 
+# Non-blocking logging: records are handed to an in-memory queue and a single
+# listener thread does the actual stream writes, so the monitoring loop never
+# stalls on a slow stdout pipe
+log = logging.getLogger(__name__)
+if not log.handlers:
+    log.setLevel(logging.INFO)
+    log.propagate = False
+    _log_queue = queue.SimpleQueue()
+    log.addHandler(logging.handlers.QueueHandler(_log_queue))
+    _log_listener = logging.handlers.QueueListener(_log_queue, logging.StreamHandler())
+    _log_listener.start()
+
 try:
     import firebase_admin
     from firebase_admin import credentials, firestore
     firebase_available = True
 except ImportError:
     firebase_available = False
-    print("Firebase not available - automatic monitoring disabled")
+    log.info("Firebase not available - automatic monitoring disabled")
+
+# Imported once at module load - check_weather_conditions used to re-run the
+# import statement on every 5-minute cycle
+try:
+    from weather_monitor import weather_monitor
+except ImportError:
+    weather_monitor = None
+    log.warning("⚠️ weather_monitor not available - weather checks disabled")
+
+@functools.lru_cache(maxsize=1)
+def get_db():
+    """Process-wide Firestore client.
+
+    gRPC channel setup is heavyweight (HTTP/2 handshake, auth), so every
+    collaborator shares this one client and its channel instead of each
+    instance building its own."""
+    if not firebase_available:
+        log.warning("⚠️ Firebase not available - monitoring disabled")
+        return None
+    try:
+        if not firebase_admin._apps:
+            firebase_admin.initialize_app()
+        db = firestore.client()
+        log.info("✅ Firebase connected for automatic monitoring")
+        return db
+    except Exception as e:
+        log.warning(f"⚠️ Firebase initialization failed for monitoring: {e}")
+        return None
+
+
+_INF = float('inf')
+
+# Static soil alert rules - (field, low, high, alert template), firing when
+# the value falls below low or above high. Hoisted to module scope so
+# check_soil_conditions doesn't rebuild these dicts per cycle, and kept as a
+# plain numeric bounds table so the scan is two float compares per rule with
+# no per-rule function dispatch.
+_SOIL_RULES = (
+    ('moisture', 20, _INF, {
+        'type': 'critical_low_moisture',
+        'severity': 'high',
+        'message_fmt': "🚨 Critical: Soil moisture very low ({value}%)! Plants need water now.",
+        'recommendations': (
+            "Water immediately and deeply",
+            "Check irrigation system",
+            "Add water-retaining mulch"
+        )
+    }),
+    ('moisture', -_INF, 85, {
+        'type': 'soil_waterlogged',
+        'severity': 'high',
+        'message_fmt': "💧 Soil waterlogged ({value}%)! Root rot risk.",
+        'recommendations': (
+            "Stop watering immediately",
+            "Improve drainage",
+            "Check for blocked drains"
+        )
+    }),
+    ('temperature', -_INF, 35, {
+        'type': 'soil_too_hot',
+        'severity': 'high',
+        'message_fmt': "🌡️ Soil too hot ({value}°C)! Roots may be damaged.",
+        'recommendations': (
+            "Apply thick mulch immediately",
+            "Increase watering to cool soil",
+            "Provide shade over soil area"
+        )
+    }),
+    ('temperature', 5, _INF, {
+        'type': 'soil_too_cold',
+        'severity': 'medium',
+        'message_fmt': "❄️ Soil very cold ({value}°C)! Growth will slow.",
+        'recommendations': (
+            "Cover beds with frost cloth",
+            "Add insulating mulch",
+            "Move potted plants indoors"
+        )
+    }),
+    ('pH', 5.0, _INF, {
+        'type': 'soil_too_acidic',
+        'severity': 'medium',
+        'message_fmt': "🧪 Soil too acidic (pH {value})! Nutrient uptake impaired.",
+        'recommendations': (
+            "Add garden lime to raise pH",
+            "Avoid acidic fertilizers",
+            "Re-test soil in two weeks"
+        )
+    }),
+    ('pH', -_INF, 8.5, {
+        'type': 'soil_too_alkaline',
+        'severity': 'medium',
+        'message_fmt': "🧪 Soil too alkaline (pH {value})! Iron deficiency likely.",
+        'recommendations': (
+            "Add sulfur or peat moss to lower pH",
+            "Use acidifying fertilizer",
+            "Re-test soil in two weeks"
+        )
+    })
+)
+
+class AlertDedupTable:
+    """Last-sent times for alert dedup, stored as sorted parallel arrays.
+
+    The former dict kept a Python string key, boxed float, and dict slot per
+    entry (~250 bytes). Here each entry is a 64-bit key hash plus a float64
+    timestamp - 16 bytes - looked up with a binary search over contiguous
+    memory, so the table stays compact however long the process runs.
+    """
+
+    def __init__(self):
+        self._keys = np.empty(0, np.uint64)
+        self._ts = np.empty(0, np.float64)
+
+    @staticmethod
+    def _hash(key):
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest()
+        return np.uint64(int.from_bytes(digest, 'big'))
+
+    def last_sent(self, key):
+        """Return the last-sent timestamp for key, or None if never sent."""
+        h = self._hash(key)
+        idx = int(np.searchsorted(self._keys, h))
+        if idx < self._keys.size and self._keys[idx] == h:
+            return float(self._ts[idx])
+        return None
+
+    def mark(self, key, ts):
+        """Record that key was sent at timestamp ts."""
+        h = self._hash(key)
+        idx = int(np.searchsorted(self._keys, h))
+        if idx < self._keys.size and self._keys[idx] == h:
+            self._ts[idx] = ts
+        else:
+            self._keys = np.insert(self._keys, idx, h)
+            self._ts = np.insert(self._ts, idx, ts)
+
+    def __len__(self):
+        return int(self._keys.size)
+
+
+class AlertExecutor:
+    """Batches alert emails and delivers each batch over one SMTP session.
+
+    A single check can emit several alerts for several users; sending each
+    one individually costs a TLS handshake and login per message. Submitted
+    emails are collected for up to max_wait seconds (or max_batch items) and
+    flushed together through one logged-in connection.
+    """
+
+    def __init__(self, max_batch=64, max_wait=1.0):
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._queue = queue.Queue()
+        self._worker = None
+        self._worker_lock = threading.Lock()
+
+    def submit(self, recipients, subject, message):
+        """Queue an alert email (one recipient or a list) for the next batch flush."""
+        self._queue.put((recipients, subject, message))
+        with self._worker_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._drain, daemon=True)
+                self._worker.start()
+
+    def _drain(self):
+        """Collect queued emails into batches and flush until the queue idles."""
+        while True:
+            try:
+                batch = [self._queue.get(timeout=self.max_wait)]
+            except queue.Empty:
+                return
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._flush(batch)
+
+    def _flush(self, batch):
+        """Send a batch of (recipients, subject, message) over one SMTP session."""
+        gmail_email = os.environ.get('GMAIL_EMAIL')
+        gmail_password = os.environ.get('GMAIL_APP_PASSWORD')
+        if not gmail_email or not gmail_password:
+            for recipients, subject, _ in batch:
+                log.info(f"📝 Would send email to: {recipients} - Subject: {subject}")
+            return
+        try:
+            server = smtplib.SMTP("smtp.gmail.com", 587)
+            server.starttls()
+            server.login(gmail_email, gmail_password)
+            for recipients, subject, message in batch:
+                if isinstance(recipients, str):
+                    recipients = [recipients]
+                msg = MIMEMultipart('alternative')
+                msg['Subject'] = subject
+                msg['From'] = gmail_email
+                # BCC keeps recipients hidden from each other and lets one
+                # message fan out to every user
+                msg['To'] = gmail_email
+                msg['Bcc'] = ', '.join(recipients)
+                msg.attach(MIMEText(message, 'html'))
+                server.send_message(msg)
+            server.quit()
+            log.info(f"✅ Sent {len(batch)} alert email(s) in one SMTP session")
+        except Exception as e:
+            log.error(f"❌ Failed to send alert email batch: {e}")
+
+
+# Shared executor for all alert emails
+_alert_executor = AlertExecutor()
+
+# Alert email bodies, parsed once at import - substitute() only fills in the
+# handful of placeholders instead of rebuilding the whole HTML string per send
+_SOIL_EMAIL_TEMPLATE = Template("""
+        <div style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto;">
+            <h2 style="color: #16a34a;">🌱 Soil Alert for Your Plants</h2>
+            <div style="background-color: #fef3c7; border: 1px solid #f59e0b; border-radius: 8px; padding: 16px; margin: 16px 0;">
+                <h3 style="color: #92400e; margin-top: 0;">⚠️ ${message}</h3>
+            </div>
+            <div style="background-color: #f3f4f6; border-radius: 8px; padding: 16px; margin: 16px 0;">
+                <h4>Current Soil Conditions:</h4>
+                <ul style="list-style: none; padding: 0;">
+                    <li>💧 <strong>Moisture:</strong> ${moisture}%</li>
+                    <li>🌡️ <strong>Temperature:</strong> ${temperature}°C</li>
+                    <li>🧪 <strong>pH:</strong> ${ph}</li>
+                </ul>
+            </div>
+            <div style="background-color: #ecfdf5; border: 1px solid #10b981; border-radius: 8px; padding: 16px; margin: 16px 0;">
+                <h4 style="color: #065f46;">🌱 Recommended Actions:</h4>
+                <ul style="color: #065f46;">${recommendations}</ul>
+            </div>
+        </div>
+        """)
+
+_WEATHER_EMAIL_TEMPLATE = Template("""
+        <div style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto;">
+            <h2 style="color: #2563eb;">🌦️ Weather Alert for Your Plants</h2>
+            <div style="background-color: #fef3c7; border: 1px solid #f59e0b; border-radius: 8px; padding: 16px; margin: 16px 0;">
+                <h3 style="color: #92400e; margin-top: 0;">⚠️ ${message}</h3>
+            </div>
+            <div style="background-color: #f3f4f6; border-radius: 8px; padding: 16px; margin: 16px 0;">
+                <h4>Current Weather Conditions:</h4>
+                <ul style="list-style: none; padding: 0;">
+                    <li>🌡️ <strong>Temperature:</strong> ${temperature}°C</li>
+                    <li>💧 <strong>Humidity:</strong> ${humidity}%</li>
+                    <li>🌤️ <strong>Conditions:</strong> ${description}</li>
+                </ul>
+            </div>
+            <div style="background-color: #ecfdf5; border: 1px solid #10b981; border-radius: 8px; padding: 16px; margin: 16px 0;">
+                <h4 style="color: #065f46;">🌱 Recommended Actions:</h4>
+                <ul style="color: #065f46;">${recommendations}</ul>
+            </div>
+        </div>
+        """)
+
+# Minimum seconds between repeats of the same alert to the same user
+ALERT_DEDUP_TTL = 3600
+
+# Motion differencing runs on frames downscaled to this size; the OpenCV
+# chain is memory-bound, so pushing ~4-8x fewer bytes through it dominates
+_MOTION_PROC_SIZE = (320, 240)
+
+# Floor between motion alerts; the perceptual-hash gate does the real
+# dedup, this just caps email fan-out during continuous change
+MOTION_ALERT_MIN_GAP = 2.0
+# Bits of dHash difference before a snapshot counts as a new event
+ALERT_HASH_BITS = 10
+
+
+def _dhash(gray):
+    """64-bit difference hash of a grayscale image."""
+    small = cv2.resize(gray, (9, 8))
+    return int.from_bytes(np.packbits(small[:, 1:] > small[:, :-1]).tobytes(), 'big')
+
+# Snapshot encode settings - quality 75 keeps alert images legible at a
+# fraction of the encode time and attachment size
+_JPEG_PARAMS = [cv2.IMWRITE_JPEG_QUALITY, 75]
+
+# The only soil_data fields the checks and alert emails actually read
+_SOIL_FIELDS = ['moisture', 'temperature', 'pH', 'timestamp']
+
 
 class AutomaticMonitoring:
     def __init__(self):
         self.db = None
         self.monitoring_active = False
+        self.motion_monitor_active = False
         self.check_interval = 300  # 5 minutes in seconds
-        self.last_weather_alert = {}
-        self.last_soil_alert = {}
-        
-        # Initialize Firebase if available
-        if firebase_available:
+        # Cached weather reading so consecutive cycles don't burn API quota
+        self._wx_cache = None
+        self._wx_cache_ts = 0.0
+        self.last_weather_alert = AlertDedupTable()
+        self.last_soil_alert = AlertDedupTable()
+        # One authenticated SMTP session reused across alerts; the pool
+        # parallelizes MIME building for multi-recipient fan-out
+        self._smtp = None
+        self._smtp_lock = threading.Lock()
+        self._send_pool = ThreadPoolExecutor(max_workers=5, thread_name_prefix='alert-send')
+        # Motion events queue up here; a background thread flushes them to
+        # Firestore in bulk instead of one blocking set() per event
+        self._pending_events = deque()
+        self._event_flusher = None
+        # Latest soil reading pushed by Firestore, so periodic checks read
+        # memory instead of issuing a query every cycle
+        self._latest_soil = None
+        self._soil_lock = threading.Lock()
+        self._soil_unsub = None
+        # Monitoring thread bookkeeping - the stop event lives on the thread's
+        # own asyncio loop so stop_monitoring can wake a parked sleep
+        self._thread = None
+        self._loop = None
+        self._stop_event = None
+
+        # All instances share the process-wide Firestore client
+        self.db = get_db()
+
+        # One Storage bucket handle for the life of the process -
+        # storage.bucket() rebuilds a client wrapper on every call
+        self._bucket = None
+        if self.db is not None:
             try:
-                try:
-                    app = firebase_admin.get_app()
-                    self.db = firestore.client(app)
-                    print("✅ Firebase connected for automatic monitoring")
-                except ValueError:
-                    if not firebase_admin._apps:
-                        firebase_admin.initialize_app()
-                        self.db = firestore.client()
-                        print("✅ Firebase connected for automatic monitoring")
-                    else:
-                        self.db = firestore.client()
-                        print("✅ Firebase connected for automatic monitoring")
+                from firebase_admin import storage
+                self._bucket = storage.bucket()
             except Exception as e:
-                print(f"⚠️ Firebase initialization failed for monitoring: {e}")
-                self.db = None
-        else:
-            print("⚠️ Firebase not available - monitoring disabled")
-    
+                log.warning(f"⚠️ Firebase Storage not available: {e}")
+
+        self._attach_soil_listener()
+
+    def _attach_soil_listener(self):
+        """Subscribe to soil updates; paired with the teardown in stop_monitoring."""
+        if self.db is None or self._soil_unsub is not None:
+            return
+        try:
+            # Project only the fields the checks read - no point shipping
+            # the full nutrient payload over the wire every update
+            soil_query = self.db.collection('soil_data') \
+                .select(_SOIL_FIELDS) \
+                .order_by('timestamp', direction=firestore.Query.DESCENDING).limit(1)
+            self._soil_unsub = soil_query.on_snapshot(self._on_soil_snapshot)
+            log.info("👂 Listening for soil data updates")
+        except Exception as e:
+            log.warning(f"⚠️ Could not attach soil data listener: {e}")
+
+    def _on_soil_snapshot(self, docs, changes, read_time):
+        """Cache the newest soil reading whenever Firestore pushes a change."""
+        try:
+            if docs:
+                with self._soil_lock:
+                    self._latest_soil = docs[0].to_dict()
+        except Exception as e:
+            log.warning(f"⚠️ Soil snapshot callback failed: {e}")
+
     def get_user_emails(self):
         """Get list of user emails from Firebase users or settings"""
         # For now, we'll use a default email from environment
@@ -91,13 +438,42 @@ class AutomaticMonitoring:
     #         print(f"❌ Failed to send email: {e}")
     #         return False
     
+    def _get_smtp(self):
+        """Return a cached, authenticated SMTP connection.
+
+        The TLS handshake plus AUTH costs seconds on a motion burst;
+        reuse one SMTP_SSL session and reconnect only when the server
+        has dropped it. Callers must hold self._smtp_lock."""
+        gmail_email = os.environ.get('GMAIL_EMAIL')
+        gmail_password = os.environ.get('GMAIL_APP_PASSWORD')
+        if self._smtp is not None:
+            try:
+                self._smtp.noop()
+                return self._smtp
+            except Exception:
+                self._smtp = None
+        smtp = smtplib.SMTP_SSL('smtp.gmail.com', 465)
+        smtp.login(gmail_email, gmail_password)
+        self._smtp = smtp
+        return smtp
+
+    def _send_message(self, msg):
+        """Send a prepared message over the shared SMTP session,
+        reconnecting once if the server closed it while idle."""
+        with self._smtp_lock:
+            try:
+                self._get_smtp().send_message(msg)
+            except smtplib.SMTPServerDisconnected:
+                self._smtp = None
+                self._get_smtp().send_message(msg)
+
     def send_email(self, to_email, subject, message):
         """Send email using Gmail SMTP"""
         try:
             gmail_email = os.environ.get('GMAIL_EMAIL')
             gmail_password = os.environ.get('GMAIL_APP_PASSWORD')
             if not gmail_email or not gmail_password:
-                print(f"� Would send email to: {to_email} - Subject: {subject}")
+                log.info(f"📝 Would send email to: {to_email} - Subject: {subject}")
                 return False
             msg = MIMEMultipart('alternative')
             msg['Subject'] = subject
@@ -105,152 +481,411 @@ class AutomaticMonitoring:
             msg['To'] = to_email
             html_part = MIMEText(message, 'html')
             msg.attach(html_part)
-            server = smtplib.SMTP("smtp.gmail.com", 587)
-            server.starttls()
-            server.login(gmail_email, gmail_password)
-            server.send_message(msg)
-            server.quit()
-            print(f"✅ Alert email sent to: {to_email}")
+            self._send_message(msg)
+            log.info(f"✅ Alert email sent to: {to_email}")
             return True
         except Exception as e:
-            print(f"❌ Failed to send email: {e}")
+            log.error(f"❌ Failed to send email: {e}")
             return False
 
-    def send_email_with_image(self, image_path, to_email):
-        """Send an email with the captured image."""
+    def send_email_with_image(self, img_bytes, to_email):
+        """Send an email with the captured snapshot attached from memory."""
         try:
             gmail_email = os.environ.get('GMAIL_EMAIL')
             gmail_password = os.environ.get('GMAIL_APP_PASSWORD')
             if not gmail_email or not gmail_password:
-                print(f"📝 Would send email to: {to_email} - Subject: Security Alert")
+                log.info(f"📝 Would send email to: {to_email} - Subject: Security Alert")
                 return False
             msg = EmailMessage()
             msg['Subject'] = 'Security Alert: Motion Detected'
             msg['From'] = gmail_email
             msg['To'] = to_email
             msg.set_content('Motion detected. See attached image.')
-            with open(image_path, 'rb') as img:
-                img_data = img.read()
-                img_type, _ = mimetypes.guess_type(img.name)
-                if img_type:
-                    maintype, subtype = img_type.split('/')
-                else:
-                    maintype, subtype = 'image', 'jpeg'
-                msg.add_attachment(img_data, maintype=maintype, subtype=subtype, filename='motion.jpg')
-            with smtplib.SMTP_SSL('smtp.gmail.com', 465) as smtp:
-                smtp.login(gmail_email, gmail_password)
-                smtp.send_message(msg)
-            print(f"📧 Email sent with image {image_path}")
+            msg.add_attachment(img_bytes, maintype='image', subtype='jpeg', filename='motion.jpg')
+            self._send_message(msg)
+            log.info(f"📧 Motion alert email sent to {to_email}")
             return True
         except Exception as e:
-            print(f"❌ Failed to send email with image: {e}")
+            log.error(f"❌ Failed to send email with image: {e}")
             return False
 
+    def _capture_frames(self, cap, frame_queue):
+        """Capture worker: keeps the camera drained so it never stalls.
+
+        When detection falls behind, the oldest queued frame is dropped
+        rather than blocking capture - stale frames are worthless for
+        motion anyway."""
+        while self.motion_monitor_active:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            try:
+                frame_queue.put_nowait(frame)
+            except queue.Full:
+                try:
+                    frame_queue.get_nowait()
+                except queue.Empty:
+                    pass
+                try:
+                    frame_queue.put_nowait(frame)
+                except queue.Full:
+                    pass
+        self.motion_monitor_active = False
+
+    def _alert_worker(self, alert_queue):
+        """Alert worker: emails and the Firebase upload run here so the
+        detection loop never blocks on SMTP or HTTP."""
+        while True:
+            item = alert_queue.get()
+            if item is None:
+                break
+            img_bytes, timestamp = item
+            emails = self.get_user_emails()
+            # MIME building runs in parallel; the actual sends share the
+            # cached SMTP session
+            list(self._send_pool.map(
+                lambda email: self.send_email_with_image(img_bytes, email), emails))
+            self.upload_photo_to_firebase(img_bytes, timestamp)
+
     def monitor_motion_and_alert(self, camera_index=0, motion_threshold=30):
-        """Monitor for motion, capture image, send email alert, and upload to Firebase."""
-        print("🚨 Starting motion detection for security alerts...")
+        """Monitor for motion, capture image, send email alert, and upload to Firebase.
+
+        Runs as a three-stage pipeline: a capture thread feeds a small
+        bounded queue, this thread does the differencing, and an alert
+        thread handles email/upload so a triggered alert never drops
+        camera frames."""
+        log.info("🚨 Starting motion detection for security alerts...")
         cap = cv2.VideoCapture(camera_index)
         ret, frame1 = cap.read()
         ret, frame2 = cap.read()
-        while True:
-            diff = cv2.absdiff(frame1, frame2)
-            gray = cv2.cvtColor(diff, cv2.COLOR_BGR2GRAY)
-            blur = cv2.GaussianBlur(gray, (5,5), 0)
-            _, thresh = cv2.threshold(blur, 20, 255, cv2.THRESH_BINARY)
-            dilated = cv2.dilate(thresh, None, iterations=3)
-            contours, _ = cv2.findContours(dilated, cv2.RETR_TREE, cv2.CHAIN_APPROX_SIMPLE)
-            motion_detected = False
-            for contour in contours:
-                if cv2.contourArea(contour) < motion_threshold:
+        if not ret:
+            cap.release()
+            log.error("❌ Could not read from camera for motion detection")
+            return
+        frame_queue = queue.Queue(maxsize=4)
+        alert_queue = queue.Queue()
+        self.motion_monitor_active = True
+        threading.Thread(target=self._capture_frames, args=(cap, frame_queue),
+                         name="AutomaticMonitoring:capture", daemon=True).start()
+        threading.Thread(target=self._alert_worker, args=(alert_queue,),
+                         name="AutomaticMonitoring:alerts", daemon=True).start()
+        last_alert = 0.0
+        last_alert_hash = None
+        # Detection runs on a small grayscale copy; the full-resolution frame
+        # is only touched for drawing and the saved snapshot. Contour areas
+        # and boxes are scaled back to full-frame coordinates.
+        sx = frame1.shape[1] / _MOTION_PROC_SIZE[0]
+        sy = frame1.shape[0] / _MOTION_PROC_SIZE[1]
+        area_scale = sx * sy
+        # UMat keeps the resize/diff/blur/threshold/dilate chain on the
+        # GPU via OpenCL where available (transparent CPU fallback
+        # otherwise); data only comes back to the host for findContours
+        gray_prev = cv2.cvtColor(cv2.resize(cv2.UMat(frame1), _MOTION_PROC_SIZE), cv2.COLOR_BGR2GRAY)
+        try:
+            while self.motion_monitor_active:
+                try:
+                    frame2 = frame_queue.get(timeout=1.0)
+                except queue.Empty:
                     continue
-                motion_detected = True
-                # Draw rectangle (optional)
-                (x, y, w, h) = cv2.boundingRect(contour)
-                cv2.rectangle(frame1, (x, y), (x+w, y+h), (0,255,0), 2)
-            if motion_detected:
-                timestamp = int(time.time())
-                img_path = f"motion_{timestamp}.jpg"
-                cv2.imwrite(img_path, frame1)
-                # Send email
-                for email in self.get_user_emails():
-                    self.send_email_with_image(img_path, email)
-                print(f"📸 Motion detected and image saved: {img_path}")
-                # Upload to Firebase Storage
-                self.upload_photo_to_firebase(img_path, timestamp)
-                time.sleep(10)  # Avoid spamming
-            frame1 = frame2
-            ret, frame2 = cap.read()
-            if not ret:
-                break
-        cap.release()
-        cv2.destroyAllWindows()
+                gray_curr = cv2.cvtColor(cv2.resize(cv2.UMat(frame2), _MOTION_PROC_SIZE), cv2.COLOR_BGR2GRAY)
+                diff = cv2.absdiff(gray_prev, gray_curr)
+                blur = cv2.GaussianBlur(diff, (5,5), 0)
+                _, thresh = cv2.threshold(blur, 20, 255, cv2.THRESH_BINARY)
+                dilated = cv2.dilate(thresh, None, iterations=3)
+                # The only per-frame decision is "was there motion anywhere",
+                # and one SIMD pass over the mask answers it; contour
+                # extraction only runs on the rare alert frames that need
+                # rectangles drawn on the snapshot
+                dilated_host = dilated.get()
+                motion_detected = cv2.countNonZero(dilated_host) * area_scale > motion_threshold
+                # Cooldown timestamp instead of sleeping so capture and
+                # detection keep running between alerts
+                if motion_detected and time.monotonic() - last_alert >= MOTION_ALERT_MIN_GAP:
+                    # Perceptual gate: a long-running event keeps producing
+                    # near-identical frames, so only alert when the scene
+                    # actually differs from the last alerted snapshot -
+                    # distinct events inside the old 10 s blind window now
+                    # get through, repeats don't
+                    h = _dhash(gray_curr.get())
+                    if last_alert_hash is not None and (h ^ last_alert_hash).bit_count() < ALERT_HASH_BITS:
+                        frame1 = frame2
+                        gray_prev = gray_curr
+                        continue
+                    last_alert_hash = h
+                    last_alert = time.monotonic()
+                    contours, _ = cv2.findContours(dilated_host, cv2.RETR_TREE, cv2.CHAIN_APPROX_SIMPLE)
+                    for contour in contours:
+                        if cv2.contourArea(contour) * area_scale < motion_threshold:
+                            continue
+                        # Draw rectangle (optional)
+                        (x, y, w, h) = cv2.boundingRect(contour)
+                        cv2.rectangle(frame1, (int(x * sx), int(y * sy)),
+                                      (int((x + w) * sx), int((y + h) * sy)), (0,255,0), 2)
+                    timestamp = int(time.time())
+                    # Encode in memory; no disk round-trip on the detection
+                    # thread, and the email layer reuses the same bytes
+                    ok, buf = cv2.imencode('.jpg', frame1, _JPEG_PARAMS)
+                    if ok:
+                        log.info("📸 Motion detected - snapshot queued for alerts")
+                        alert_queue.put((buf.tobytes(), timestamp))
+                frame1 = frame2
+                gray_prev = gray_curr
+        finally:
+            self.motion_monitor_active = False
+            alert_queue.put(None)
+            cap.release()
+            cv2.destroyAllWindows()
 
-    def upload_photo_to_firebase(self, img_path, timestamp):
+    def upload_photo_to_firebase(self, img_bytes, timestamp):
         """Upload photo to Firebase Storage and log in Firestore."""
-        if not firebase_available or self.db is None:
-            print("⚠️ Firebase not available, skipping upload.")
+        if not firebase_available or self.db is None or self._bucket is None:
+            log.warning("⚠️ Firebase not available, skipping upload.")
             return
         try:
-            from firebase_admin import storage
-            bucket = storage.bucket()
-            blob = bucket.blob(f"motion_photos/{os.path.basename(img_path)}")
-            blob.upload_from_filename(img_path)
+            blob = self._bucket.blob(f"motion_photos/motion_{timestamp}.jpg")
+            blob.upload_from_string(img_bytes, content_type='image/jpeg')
             blob.make_public()
             photo_url = blob.public_url
-            print(f"☁️ Uploaded photo to Firebase: {photo_url}")
-            # Log event in Firestore
-            doc_ref = self.db.collection("motion_events").document(str(timestamp))
-            doc_ref.set({
-                "timestamp": timestamp,
-                "photo_url": photo_url,
-                "event": "motion_detected"
-            })
-            print(f"📝 Motion event logged in Firestore.")
+            log.info(f"☁️ Uploaded photo to Firebase: {photo_url}")
+            self._queue_motion_event(timestamp, photo_url)
         except Exception as e:
-            print(f"❌ Failed to upload photo to Firebase: {e}")
-    
-    def monitoring_loop(self):
-        """Main monitoring loop that runs in background"""
-        print(f"🔄 Starting automatic monitoring (checking every {self.check_interval} seconds)")
-        
-        while self.monitoring_active:
+            log.error(f"❌ Failed to upload photo to Firebase: {e}")
+
+    def _queue_motion_event(self, timestamp, photo_url):
+        """Queue a motion event for the bulk Firestore flusher."""
+        self._pending_events.append((timestamp, photo_url))
+        if self._event_flusher is None:
+            self._event_flusher = threading.Thread(
+                target=self._flush_motion_events,
+                name="AutomaticMonitoring:events", daemon=True)
+            self._event_flusher.start()
+
+    def _flush_motion_events(self):
+        """Drain queued motion events into Firestore in bulk.
+
+        One blocking set() per event caps throughput at a few dozen
+        writes per second under bursty motion; the bulk writer pipelines
+        everything queued in the last half second."""
+        while True:
+            time.sleep(0.5)
+            if not self._pending_events:
+                continue
             try:
-                print(f"🔍 Checking conditions at {datetime.now().strftime('%H:%M:%S')}")
-                
-                # Check soil conditions
-                self.check_soil_conditions()
-                
-                # Check weather conditions
-                self.check_weather_conditions()
-                
-                print(f"✅ Monitoring check complete")
-                
-                # Wait for next check
-                time.sleep(self.check_interval)
-                
+                bw = self.db.bulk_writer()
+                count = 0
+                while self._pending_events:
+                    timestamp, photo_url = self._pending_events.popleft()
+                    doc_ref = self.db.collection("motion_events").document(str(timestamp))
+                    bw.set(doc_ref, {
+                        "timestamp": timestamp,
+                        "photo_url": photo_url,
+                        "event": "motion_detected"
+                    })
+                    count += 1
+                bw.flush()
+                log.info(f"📝 {count} motion event(s) logged in Firestore.")
             except Exception as e:
-                print(f"❌ Error in monitoring loop: {e}")
-                time.sleep(60)  # Wait 1 minute before retrying
+                log.error(f"❌ Failed to log motion events: {e}")
     
+    def check_soil_conditions(self):
+        """Check the latest soil reading and send alerts for bad conditions"""
+        if not self.db:
+            return
+        try:
+            # Prefer the reading pushed by the snapshot listener - zero RPC
+            with self._soil_lock:
+                latest_reading = self._latest_soil
+            if latest_reading is None:
+                # Listener hasn't delivered yet (or failed to attach) - fall
+                # back to a direct query for the newest reading
+                soil_ref = self.db.collection('soil_data')
+                docs = soil_ref.select(_SOIL_FIELDS) \
+                    .order_by('timestamp', direction=firestore.Query.DESCENDING).limit(1).get()
+                latest_reading = docs[0].to_dict() if docs else None
+            if not latest_reading:
+                return
+
+            reading_values = {
+                'moisture': latest_reading.get('moisture', 50),
+                'temperature': latest_reading.get('temperature', 20),
+                'pH': latest_reading.get('pH', 7.0)
+            }
+
+            alerts = []
+            for field, low, high, template in _SOIL_RULES:
+                value = reading_values[field]
+                if value < low or value > high:
+                    alerts.append({
+                        'type': template['type'],
+                        'severity': template['severity'],
+                        'message': template['message_fmt'].format(value=value),
+                        'recommendations': template['recommendations']
+                    })
+
+            if alerts:
+                # Dedup by alert type alone and fan out one BCC email per
+                # alert, instead of building the same payload per user
+                user_emails = self.get_user_emails()
+                now = time.monotonic()
+                for alert in alerts:
+                    alert_key = alert['type']
+                    last_sent = self.last_soil_alert.last_sent(alert_key)
+                    if last_sent is not None and now - last_sent < ALERT_DEDUP_TTL:
+                        continue  # Don't repeat the same alert within an hour
+                    if self.send_soil_alert_email(user_emails, alert, latest_reading):
+                        self.last_soil_alert.mark(alert_key, now)
+        except Exception as e:
+            log.error(f"❌ Error checking soil conditions: {e}")
+
+    def send_soil_alert_email(self, emails, alert, soil_data):
+        """Send a soil condition alert email to one or more recipients"""
+        subject = f"🌱 Soil Alert: {alert['type'].replace('_', ' ').title()}"
+        message = _SOIL_EMAIL_TEMPLATE.substitute(
+            message=alert['message'],
+            moisture=soil_data.get('moisture', 'n/a'),
+            temperature=soil_data.get('temperature', 'n/a'),
+            ph=soil_data.get('pH', 'n/a'),
+            recommendations="".join([f"<li>{rec}</li>" for rec in alert['recommendations']])
+        )
+        _alert_executor.submit(emails, subject, message)
+        return True
+
+    def check_weather_conditions(self):
+        """Check weather and send alerts when conditions threaten plants"""
+        if weather_monitor is None:
+            return
+        try:
+            # Reuse a recent reading instead of hitting the weather API every
+            # cycle; the TTL is twice the check interval so one transient API
+            # hiccup doesn't leave a whole cycle without data
+            now = time.monotonic()
+            if self._wx_cache is not None and now - self._wx_cache_ts < self.check_interval * 2:
+                current_weather = self._wx_cache
+            else:
+                current_weather = weather_monitor.get_current_weather()
+                self._wx_cache = current_weather
+                self._wx_cache_ts = now
+            user_emails = self.get_user_emails()
+            if not user_emails:
+                return
+            # Alerts don't vary by user, so evaluate them once and fan out
+            # one BCC email per alert type
+            alerts = weather_monitor.check_weather_alerts(user_emails[0], current_weather)
+            now = time.monotonic()
+            for alert in alerts:
+                alert_key = alert['type']
+                last_sent = self.last_weather_alert.last_sent(alert_key)
+                if last_sent is not None and now - last_sent < ALERT_DEDUP_TTL:
+                    continue  # Don't repeat the same alert within an hour
+                if self.send_weather_alert_email(user_emails, alert, current_weather):
+                    self.last_weather_alert.mark(alert_key, now)
+        except Exception as e:
+            log.error(f"❌ Error checking weather conditions: {e}")
+
+    def send_weather_alert_email(self, emails, alert, weather_data):
+        """Send a weather alert email to one or more recipients"""
+        subject = f"🌦️ Weather Alert: {alert['type'].replace('_', ' ').title()}"
+        message = _WEATHER_EMAIL_TEMPLATE.substitute(
+            message=alert['message'],
+            temperature=weather_data['temperature'],
+            humidity=weather_data['humidity'],
+            description=weather_data['description'],
+            recommendations="".join([f"<li>{rec}</li>" for rec in alert['recommendations']])
+        )
+        _alert_executor.submit(emails, subject, message)
+        return True
+
+    async def _sleep_until_stop(self, timeout):
+        """Sleep for timeout seconds, waking immediately if stop is requested."""
+        try:
+            await asyncio.wait_for(self._stop_event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    async def monitoring_loop(self):
+        """Main monitoring loop - an asyncio coroutine instead of a sleeping thread"""
+        log.info(f"🔄 Starting automatic monitoring (checking every {self.check_interval} seconds)")
+
+        self._loop = asyncio.get_running_loop()
+        self._stop_event = asyncio.Event()
+
+        while self.monitoring_active and not self._stop_event.is_set():
+            try:
+                log.info(f"🔍 Checking conditions at {datetime.now().strftime('%H:%M:%S')}")
+
+                # The soil and weather checks are independent IO (Firestore vs
+                # weather API), so run them concurrently; return_exceptions
+                # keeps one failure from cancelling the other check
+                results = await asyncio.gather(
+                    asyncio.to_thread(self.check_soil_conditions),
+                    asyncio.to_thread(self.check_weather_conditions),
+                    return_exceptions=True
+                )
+                for result in results:
+                    if isinstance(result, Exception):
+                        log.error(f"❌ Monitoring check failed: {result}")
+
+                log.info(f"✅ Monitoring check complete")
+
+                # Wait for next check - returns at once if stop is requested
+                await self._sleep_until_stop(self.check_interval)
+
+            except Exception as e:
+                log.error(f"❌ Error in monitoring loop: {e}")
+                await self._sleep_until_stop(60)  # Wait 1 minute before retrying
+
+    def _run_monitoring_loop(self):
+        """Entry point for the monitoring thread - hosts the coroutine loop"""
+        asyncio.run(self.monitoring_loop())
+
     def start_monitoring(self):
         """Start automatic monitoring in background thread"""
         if self.monitoring_active:
-            print("⚠️ Monitoring already active")
+            log.warning("⚠️ Monitoring already active")
             return True
-        
+
         self.monitoring_active = True
-        
-        # Start monitoring in background thread (works even without Firebase for weather)
-        monitoring_thread = threading.Thread(target=self.monitoring_loop, daemon=True)
-        monitoring_thread.start()
-        
-        print("🚀 Automatic monitoring started!")
+
+        # Re-subscribe after a stop - stop_monitoring tears the listener down
+        self._attach_soil_listener()
+
+        # Start monitoring in background thread (works even without Firebase
+        # for weather); named so it's easy to spot in thread dumps
+        self._thread = threading.Thread(target=self._run_monitoring_loop,
+                                        daemon=True, name="AutomaticMonitoring:monitor")
+        self._thread.start()
+
+        log.info("🚀 Automatic monitoring started!")
         return True
     
     def stop_monitoring(self):
         """Stop automatic monitoring"""
         self.monitoring_active = False
-        print("⏹️ Automatic monitoring stopped")
+        # Wake the loop out of its sleep instead of letting it doze for up to
+        # five more minutes
+        if self._loop is not None and self._stop_event is not None:
+            try:
+                self._loop.call_soon_threadsafe(self._stop_event.set)
+            except RuntimeError:
+                # Loop already closed (repeated stop) - nothing to wake
+                pass
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+        # Drop the stale loop references so a repeated stop stays a no-op
+        self._loop = None
+        self._stop_event = None
+        if self._soil_unsub is not None:
+            try:
+                self._soil_unsub.unsubscribe()
+            except Exception:
+                pass
+            self._soil_unsub = None
+            # Drop the cached reading too - without the listener it would
+            # stay frozen and keep feeding the checks stale data forever
+            with self._soil_lock:
+                self._latest_soil = None
+        log.info("⏹️ Automatic monitoring stopped")
     
     def get_status(self):
         """Get monitoring status"""
@@ -1,7 +1,27 @@
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import atexit
+import logging
 import os
-from datetime import datetime
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
 import json
+import random
+
+# orjson parses API payloads several times faster than the stdlib; fall
+# back to requests' built-in json() when it isn't installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Module logger with lazy %s formatting - per-record chatter goes to
+# debug so it costs one level check per call instead of an f-string plus
+# a synchronous stdout flush under the GIL
+logger = logging.getLogger(__name__)
 
 try:
     import firebase_admin
@@ -9,7 +29,274 @@ try:
     firebase_available = True
 except ImportError:
     firebase_available = False
-    print("Firebase not available - using mock/API data only")
+    logger.info("Firebase not available - using mock/API data only")
+
+# Open-Meteo WMO weather code -> description, built once at import instead
+# of inside every API call
+_WEATHER_DESC = {
+    0: 'clear sky', 1: 'mainly clear', 2: 'partly cloudy', 3: 'overcast',
+    45: 'fog', 48: 'depositing rime fog', 51: 'light drizzle', 53: 'moderate drizzle',
+    55: 'dense drizzle', 61: 'slight rain', 63: 'moderate rain', 65: 'heavy rain',
+    71: 'slight snow', 73: 'moderate snow', 75: 'heavy snow',
+    80: 'slight rain showers', 81: 'moderate rain showers', 82: 'violent rain showers',
+    95: 'thunderstorm', 96: 'thunderstorm with slight hail', 99: 'thunderstorm with heavy hail'
+}
+
+# Coarse grouping of the same codes for the 'main' field
+_WEATHER_MAIN_BY_CODE = {}
+for _codes, _main in (((0, 1), 'Clear'),
+                      ((2, 3), 'Clouds'),
+                      ((61, 63, 65, 80, 81, 82), 'Rain'),
+                      ((95, 96, 99), 'Thunderstorm'),
+                      ((71, 73, 75), 'Snow')):
+    for _code in _codes:
+        _WEATHER_MAIN_BY_CODE[_code] = _main
+
+
+# Open-Meteo request URLs for Vancouver (49.2827, -123.1207), assembled
+# once at import - every call queries the same coordinates, so there is
+# nothing to format per request
+_OM_CURRENT_URL = ("https://api.open-meteo.com/v1/forecast"
+                   "?latitude=49.2827&longitude=-123.1207"
+                   "&current=temperature_2m,relative_humidity_2m,weather_code,wind_speed_10m,is_day"
+                   "&temperature_unit=celsius&wind_speed_unit=kmh&timezone=auto")
+_OM_FORECAST_URL = ("https://api.open-meteo.com/v1/forecast"
+                    "?latitude=49.2827&longitude=-123.1207"
+                    "&daily=temperature_2m_max,temperature_2m_min,precipitation_probability_max,weather_code"
+                    "&temperature_unit=celsius&timezone=auto&forecast_days=5")
+
+# Sensor-based classification tables, indexed by bucketized readings
+# instead of re-walking a branchy if/elif ladder per record. Bright skies
+# classify by temperature, dimmer skies by humidity.
+_DESC_BRIGHT = ("cool but bright", "warm and sunny", "hot and sunny with intense sunlight")
+_DESC_MID = ("partly cloudy", "partly cloudy and humid")
+_DESC_DIM = ("overcast", "overcast and humid")
+_MAIN_BY_LIGHT = ("Overcast", "Clouds", "Clear")
+
+# Mock-data season tables (Vancouver-like climate): month -> season index
+# (0=winter, 1=spring, 2=summer, 3=fall), then per-season temperature
+# ranges and typical conditions
+_SEASON = (0, 0, 1, 1, 1, 2, 2, 2, 3, 3, 3, 0)  # indexed by month - 1
+_SEASON_TEMP = ((2, 8), (12, 18), (20, 28), (8, 16))
+_SEASON_CONDS = (
+    ('overcast', 'light rain', 'partly cloudy', 'fog'),
+    ('partly cloudy', 'light rain', 'overcast', 'mainly clear'),
+    ('clear sky', 'mainly clear', 'partly cloudy'),
+    ('overcast', 'light rain', 'partly cloudy', 'fog'),
+)
+
+# Alert rule table for check_weather_alerts. Base recommendations are
+# interned once at import; each rule is a (predicate, builder) pair over a
+# context dict so the check loop allocates nothing for rules that don't
+# fire. Soil-aware tweaks run as post-processors keyed by alert type and
+# copy the shared tuple only when they actually add entries; consumers
+# just iterate and don't care about list vs tuple.
+_HEAT_RECS = (
+    "Provide shade for sensitive plants",
+    "Increase watering frequency",
+    "Water early morning or late evening",
+    "Mulch around plants to retain moisture",
+)
+_RAIN_RECS = (
+    "Move potted plants under cover",
+    "Ensure proper drainage in garden beds",
+    "Reduce watering schedule",
+    "Secure plant supports and stakes",
+)
+_UV_RECS = (
+    "Use shade cloth for delicate plants",
+    "Water more frequently",
+    "Consider afternoon shade",
+)
+_DRY_RECS = (
+    "Increase humidity around plants",
+    "Water more frequently",
+    "Group plants together",
+    "Use humidity trays",
+)
+_SOIL_HEAT_RECS = (
+    "Apply thick mulch immediately",
+    "Increase watering to cool soil",
+    "Provide shade over soil area",
+    "Water in early morning to pre-cool soil",
+)
+_SOIL_DROUGHT_RECS = (
+    "Water immediately and deeply",
+    "Check irrigation system",
+    "Add water-retaining mulch",
+    "Consider emergency watering schedule",
+)
+_SOIL_WET_RECS = (
+    "Stop watering immediately",
+    "Improve drainage",
+    "Check for blocked drains",
+    "Consider temporary raised planting",
+)
+
+
+def _build_heat_alert(ctx):
+    temp = ctx['temp']
+    return {
+        'type': 'extreme_heat',
+        'severity': 'high' if temp > 35 else 'medium',
+        'message': f"⚠️ Extreme heat warning! Temperature: {temp}°C. Protect your plants from intense sunlight.",
+        'recommendations': _HEAT_RECS
+    }
+
+
+def _build_rain_alert(ctx):
+    # Severity only distinguishes "more than 3" periods, so stop
+    # counting once that's settled instead of scanning the rest
+    heavy_rain_hours = 0
+    for f in ctx['forecast']():
+        if f['precipitation'] > 5:
+            heavy_rain_hours += 1
+            if heavy_rain_hours > 3:
+                break
+    return {
+        'type': 'rain_warning',
+        'severity': 'high' if heavy_rain_hours > 3 else 'medium',
+        'message': f"🌧️ Rain expected! Current conditions: {ctx['description']}. Heavy rain forecasted for {heavy_rain_hours} periods.",
+        'recommendations': _RAIN_RECS
+    }
+
+
+def _build_uv_alert(ctx):
+    return {
+        'type': 'high_uv',
+        'severity': 'medium',
+        'message': f"☀️ High UV index ({ctx['uv']})! Plants may need protection from intense sunlight.",
+        'recommendations': _UV_RECS
+    }
+
+
+def _build_dry_alert(ctx):
+    soil_moisture = ctx['soil_moisture']
+    return {
+        'type': 'dry_conditions',
+        'severity': 'high' if (soil_moisture is not None and soil_moisture < 30) else 'medium',
+        'message': f"🌵 Very dry conditions! Humidity: {ctx['humidity']}%, Temperature: {ctx['temp']}°C",
+        'recommendations': _DRY_RECS
+    }
+
+
+def _build_soil_heat_alert(ctx):
+    return {
+        'type': 'soil_overheating',
+        'severity': 'high',
+        'message': f"🌡️ Soil overheating! Soil temperature: {ctx['soil_temp']}°C. Root damage possible.",
+        'recommendations': _SOIL_HEAT_RECS
+    }
+
+
+def _build_soil_drought_alert(ctx):
+    return {
+        'type': 'soil_drought',
+        'severity': 'high',
+        'message': f"🚨 Soil drought emergency! Moisture: {ctx['soil_moisture']}%. Plants in distress.",
+        'recommendations': _SOIL_DROUGHT_RECS
+    }
+
+
+def _build_soil_wet_alert(ctx):
+    return {
+        'type': 'soil_waterlogged',
+        'severity': 'high',
+        'message': f"💧 Soil waterlogged! Moisture: {ctx['soil_moisture']}%. Root rot risk.",
+        'recommendations': _SOIL_WET_RECS
+    }
+
+
+_ALERT_RULES = (
+    (lambda c: c['temp'] > 30 and c['main'] in ('Clear', 'Sun'), _build_heat_alert),
+    (lambda c: c['main'] in ('Rain', 'Thunderstorm') or 'rain' in c['desc_lower'], _build_rain_alert),
+    (lambda c: c['uv'] is not None and c['uv'] > 8, _build_uv_alert),
+    (lambda c: c['humidity'] < 30 and c['temp'] > 25, _build_dry_alert),
+    (lambda c: c['soil_temp'] is not None and c['soil_temp'] > 28, _build_soil_heat_alert),
+    (lambda c: c['soil_moisture'] is not None and c['soil_moisture'] < 20, _build_soil_drought_alert),
+    (lambda c: c['soil_moisture'] is not None and c['soil_moisture'] > 85, _build_soil_wet_alert),
+)
+
+
+def _soil_extend_heat(alert, ctx):
+    soil_moisture = ctx['soil_moisture']
+    if soil_moisture is not None and soil_moisture < 40:
+        alert['recommendations'] = [
+            *alert['recommendations'],
+            f"⚠️ Soil moisture is low ({soil_moisture}%) - increase irrigation immediately",
+            "Consider drip irrigation for consistent moisture"
+        ]
+
+
+def _soil_extend_rain(alert, ctx):
+    soil_moisture = ctx['soil_moisture']
+    if soil_moisture is not None and soil_moisture > 70:
+        alert['recommendations'] = [
+            *alert['recommendations'],
+            f"⚠️ Soil is already saturated ({soil_moisture}%) - improve drainage urgently",
+            "Consider raised beds or adding sand to heavy soils"
+        ]
+
+
+def _soil_extend_dry(alert, ctx):
+    soil_moisture = ctx['soil_moisture']
+    if soil_moisture is None:
+        return
+    if soil_moisture < 30:
+        alert['recommendations'] = [f"🚨 Critical: Both air and soil are very dry! Soil moisture: {soil_moisture}%", *alert['recommendations']]
+    elif soil_moisture < 50:
+        alert['recommendations'] = [f"⚠️ Soil moisture is getting low: {soil_moisture}%", *alert['recommendations']]
+
+
+_SOIL_POSTPROCESSORS = {
+    'extreme_heat': _soil_extend_heat,
+    'rain_warning': _soil_extend_rain,
+    'dry_conditions': _soil_extend_dry,
+}
+
+
+def _ts_iso(ts):
+    """ISO string for a Firestore timestamp, built at most once per record.
+
+    Falls back to the current time only when the sensor record carries no
+    usable timestamp, so the common path allocates no datetime at all.
+    """
+    return ts.isoformat() if hasattr(ts, 'isoformat') else datetime.now().isoformat()
+
+
+def _weather_condition(code):
+    return _WEATHER_DESC.get(code, f'weather condition {code}')
+
+
+def _weather_main(code):
+    return _WEATHER_MAIN_BY_CODE.get(code, 'Clouds')
+
+
+_db = None
+_db_lock = threading.Lock()
+
+
+def _get_db():
+    """Process-wide Firestore client, built once and shared.
+
+    Repeated WeatherMonitor construction (tests, reloads) then reuses the
+    same warmed gRPC channel instead of re-paying channel setup.
+    """
+    global _db
+    if not firebase_available:
+        logger.info("⚠️ Firebase not available - using weather API/mock data only")
+        return None
+    with _db_lock:
+        if _db is None:
+            try:
+                if not firebase_admin._apps:
+                    firebase_admin.initialize_app()
+                _db = firestore.client()
+                logger.info("✅ Firebase connected for weather monitoring")
+            except Exception:
+                logger.warning("⚠️ Firebase initialization issue - using weather API only")
+    return _db
+
 
 class WeatherMonitor:
     def __init__(self):
@@ -17,71 +304,132 @@ class WeatherMonitor:
         self.base_url = "http://api.openweathermap.org/data/2.5"
         self.default_city = os.environ.get('DEFAULT_CITY', 'Vancouver')
         self.default_country = os.environ.get('DEFAULT_COUNTRY', 'CA')
-        self.db = None
+        # One session for all weather API calls - keeps the TCP/TLS connection
+        # to Open-Meteo alive between requests instead of reconnecting each
+        # time, with a small pool, automatic retries on transient 5xx, and
+        # gzip so responses arrive compressed
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=2, pool_maxsize=10,
+            max_retries=Retry(total=2, backoff_factor=0.2,
+                              status_forcelist=[502, 503, 504]))
+        self.session.mount('https://', adapter)
+        self.session.headers.update({'Accept-Encoding': 'gzip'})
+        # Short TTL memo for API-backed results - weather changes slowly and
+        # a single summary otherwise hits Open-Meteo several times
+        self._cache = {}
+        self._cache_lock = threading.Lock()
+        # Bounded pool for overlapping independent Firestore round-trips;
+        # kept small so we don't exhaust gRPC channels. Any Firestore write
+        # added to this class should also go through it fire-and-forget
+        # (self._exec.submit(ref.set, payload)) - update the local snapshot
+        # cache first and let the listener callback reconcile, rather than
+        # blocking the request path on the write or a read-back check
+        self._exec = ThreadPoolExecutor(max_workers=4, thread_name_prefix='weather-io')
+        # Dedicated RNG for mock data - avoids contending on the shared
+        # module-level random state from multiple request threads
+        self._rng = random.Random()
         
-        # Initialize Firebase if available - simplified approach
-        if firebase_available:
+        # Initialize Firebase if available - shared process-wide client
+        self.db = _get_db()
+
+        # Realtime listeners keep the newest sensor readings in memory, so
+        # the getters become dict lookups instead of polled Firestore
+        # queries that each cost a network round-trip
+        self._latest_outdoor = None
+        self._latest_soil = None
+        self._sensor_lock = threading.Lock()
+        self._unsub_out = None
+        self._unsub_soil = None
+        if self.db is not None:
             try:
-                # Try to get existing app or initialize quickly
-                try:
-                    app = firebase_admin.get_app()
-                    self.db = firestore.client(app)
-                    print("✅ Firebase connected for weather monitoring")
-                except ValueError:
-                    # App doesn't exist, try to initialize with timeout
-                    if not firebase_admin._apps:
-                        try:
-                            # Quick initialization attempt
-                            firebase_admin.initialize_app()
-                            self.db = firestore.client()
-                            print("✅ Firebase connected for weather monitoring")
-                        except Exception as cred_error:
-                            print(f"⚠️ Firebase credentials not available - using weather API only")
-                            self.db = None
-                    else:
-                        self.db = firestore.client()
-                        print("✅ Firebase connected for weather monitoring")
-                        
+                q_out = self.db.collection('outdoor_weather_data') \
+                    .order_by('timestamp', direction=firestore.Query.DESCENDING).limit(1)
+                self._unsub_out = q_out.on_snapshot(self._on_outdoor_snapshot)
+                q_soil = self.db.collection('soil_data') \
+                    .order_by('timestamp', direction=firestore.Query.DESCENDING).limit(1)
+                self._unsub_soil = q_soil.on_snapshot(self._on_soil_snapshot)
+                atexit.register(self._detach_listeners)
+                logger.info("👂 Listening for sensor data updates")
             except Exception as e:
-                print(f"⚠️ Firebase initialization issue - using weather API only")
-                self.db = None
-        else:
-            print("⚠️ Firebase not available - using weather API/mock data only")
-        
+                logger.warning("⚠️ Could not attach sensor listeners: %s", e)
+
+    def _on_outdoor_snapshot(self, docs, changes, read_time):
+        """Cache the newest outdoor reading whenever Firestore pushes a change."""
+        try:
+            if docs:
+                with self._sensor_lock:
+                    self._latest_outdoor = docs[0].to_dict()
+        except Exception as e:
+            logger.warning("⚠️ Outdoor snapshot callback failed: %s", e)
+
+    def _on_soil_snapshot(self, docs, changes, read_time):
+        """Cache the newest soil reading whenever Firestore pushes a change."""
+        try:
+            if docs:
+                with self._sensor_lock:
+                    self._latest_soil = docs[0].to_dict()
+        except Exception as e:
+            logger.warning("⚠️ Soil snapshot callback failed: %s", e)
+
+    def _detach_listeners(self):
+        for unsub in (self._unsub_out, self._unsub_soil):
+            if unsub is not None:
+                try:
+                    unsub.unsubscribe()
+                except Exception:
+                    pass
+
     def get_outdoor_sensor_data(self):
         """Get weather data from outdoor sensors stored in Firebase"""
         if not self.db:
             return None
-            
+        # One summary touches this several times (directly, via the current
+        # weather priority chain and via alerts); a 30 s memo collapses
+        # those to a single Firestore round-trip
+        return self._cached('outdoor_sensors', 30, self._fetch_outdoor_sensor_data)
+
+    def _fetch_outdoor_sensor_data(self):
         try:
-            # Try to get weather data from outdoor sensors
-            outdoor_ref = self.db.collection('outdoor_weather_data')
-            docs = outdoor_ref.order_by('timestamp', direction=firestore.Query.DESCENDING).limit(1).get()
-            
-            if docs:
-                doc = docs[0]
-                data = doc.to_dict()
-                
+            # Prefer the reading pushed by the snapshot listener - zero RPC
+            with self._sensor_lock:
+                data = self._latest_outdoor
+            if data is None:
+                # Listener hasn't delivered yet (or failed to attach) - fall
+                # back to a direct query for the newest reading
+                # limit_to_last walks the ascending timestamp index the
+                # sensors already populate instead of a descending scan
+                outdoor_ref = self.db.collection('outdoor_weather_data')
+                docs = outdoor_ref.order_by('timestamp').limit_to_last(1).get()
+                if docs:
+                    data = docs[0].to_dict()
+
+            if data:
+                # Bind the lookup once and parse the timestamp a single
+                # time - this transform runs for every sensor record
+                g = data.get
+                ts_iso = _ts_iso(g('timestamp'))
+
                 # Transform to standard format
                 outdoor_weather = {
-                    'temperature': data.get('temperature', 22),
-                    'humidity': data.get('humidity', 60),
-                    'pressure': data.get('pressure', 1013),
+                    'temperature': g('temperature', 22),
+                    'humidity': g('humidity', 60),
+                    'pressure': g('pressure', 1013),
                     'description': self._get_weather_description_from_sensors(data),
                     'main': self._get_weather_main_from_sensors(data),
-                    'wind_speed': data.get('wind_speed', 5.0),
-                    'visibility': data.get('visibility', 10.0),
-                    'uv_index': data.get('uv_index', 5),
-                    'light_intensity': data.get('light_intensity', 50000),  # Lux
-                    'timestamp': data.get('timestamp', datetime.now()).isoformat() if hasattr(data.get('timestamp'), 'isoformat') else datetime.now().isoformat(),
+                    'wind_speed': g('wind_speed', 5.0),
+                    'visibility': g('visibility', 10.0),
+                    'uv_index': g('uv_index', 5),
+                    'light_intensity': g('light_intensity', 50000),  # Lux
+                    'timestamp': ts_iso,
                     'source': 'outdoor_sensors'
                 }
                 
-                print(f"🌿 Using outdoor sensor data: {outdoor_weather['temperature']}°C, {outdoor_weather['humidity']}% humidity")
+                logger.debug("🌿 Using outdoor sensor data: %s°C, %s%% humidity", outdoor_weather['temperature'], outdoor_weather['humidity'])
                 return outdoor_weather
             
         except Exception as e:
-            print(f"❌ Error fetching outdoor sensor data: {e}")
+            logger.error("❌ Error fetching outdoor sensor data: %s", e)
             
         return None
     
@@ -89,85 +437,91 @@ class WeatherMonitor:
         """Get environmental context from soil sensors"""
         if not self.db:
             return None
-            
+        return self._cached('soil_env', 30, self._fetch_soil_environmental_data)
+
+    def _fetch_soil_environmental_data(self):
         try:
-            # Get latest soil data for environmental context
-            soil_ref = self.db.collection('soil_data')
-            docs = soil_ref.order_by('timestamp', direction=firestore.Query.DESCENDING).limit(1).get()
-            
-            if docs:
-                doc = docs[0]
-                soil_data = doc.to_dict()
-                
+            # Prefer the reading pushed by the snapshot listener - zero RPC
+            with self._sensor_lock:
+                soil_data = self._latest_soil
+            if soil_data is None:
+                # Get latest soil data for environmental context
+                soil_ref = self.db.collection('soil_data')
+                docs = soil_ref.order_by('timestamp').limit_to_last(1).get()
+                if docs:
+                    soil_data = docs[0].to_dict()
+
+            if soil_data:
                 # Extract environmental indicators from soil data
-                soil_temp = soil_data.get('temperature', 20)
-                soil_moisture = soil_data.get('moisture', 50)
-                
+                g = soil_data.get
+                soil_temp = g('temperature', 20)
+                soil_moisture = g('moisture', 50)
+
                 # Estimate surface conditions from soil conditions
                 estimated_air_temp = soil_temp + 2  # Air usually warmer than soil
-                
+
                 return {
                     'soil_temperature': soil_temp,
                     'soil_moisture': soil_moisture,
                     'estimated_air_temperature': estimated_air_temp,
                     'source': 'soil_sensors',
-                    'timestamp': soil_data.get('timestamp', datetime.now()).isoformat() if hasattr(soil_data.get('timestamp'), 'isoformat') else datetime.now().isoformat()
+                    'timestamp': _ts_iso(g('timestamp'))
                 }
         except Exception as e:
-            print(f"❌ Error fetching soil environmental data: {e}")
+            logger.error("❌ Error fetching soil environmental data: %s", e)
             
         return None
     
     def _get_weather_description_from_sensors(self, sensor_data):
         """Generate weather description from sensor readings"""
-        temp = sensor_data.get('temperature', 22)
-        humidity = sensor_data.get('humidity', 60)
-        light = sensor_data.get('light_intensity', 50000)
-        
-        if light > 80000:  # Very bright
-            if temp > 30:
-                return "hot and sunny with intense sunlight"
-            elif temp > 20:
-                return "warm and sunny"
-            else:
-                return "cool but bright"
-        elif light > 40000:  # Moderate light
-            if humidity > 70:
-                return "partly cloudy and humid"
-            else:
-                return "partly cloudy"
-        else:  # Low light
-            if humidity > 80:
-                return "overcast and humid"
-            else:
-                return "overcast"
+        g = sensor_data.get
+        temp = g('temperature', 22)
+        humidity = g('humidity', 60)
+        light = g('light_intensity', 50000)
+
+        li = 2 if light > 80000 else 1 if light > 40000 else 0
+        if li == 2:  # Very bright - classify by temperature
+            return _DESC_BRIGHT[2 if temp > 30 else 1 if temp > 20 else 0]
+        if li == 1:  # Moderate light - classify by humidity
+            return _DESC_MID[humidity > 70]
+        return _DESC_DIM[humidity > 80]
     
     def _get_weather_main_from_sensors(self, sensor_data):
         """Get main weather condition from sensor data"""
-        temp = sensor_data.get('temperature', 22)
         light = sensor_data.get('light_intensity', 50000)
-        
-        if light > 80000:
-            return "Clear"
-        elif light > 40000:
-            return "Clouds" 
-        else:
-            return "Overcast"
-            
+        return _MAIN_BY_LIGHT[2 if light > 80000 else 1 if light > 40000 else 0]
+            
+    def _cached(self, key, ttl, fn):
+        """Return fn() memoized under key for ttl seconds."""
+        now = time.monotonic()
+        with self._cache_lock:
+            hit = self._cache.get(key)
+            if hit is not None and now - hit[0] < ttl:
+                return hit[1]
+        value = fn()
+        with self._cache_lock:
+            self._cache[key] = (time.monotonic(), value)
+        return value
+
     def get_current_weather(self, city=None, country=None):
         """Get current weather data - prioritize outdoor sensors, then real API, then mock"""
         city = city or self.default_city
         country = country or self.default_country
         
+        # The two sensor reads are independent round-trips; start both at
+        # once and consume them in priority order
+        f_outdoor = self._exec.submit(self.get_outdoor_sensor_data)
+        f_soil = self._exec.submit(self.get_soil_environmental_data)
+
         # First priority: Real outdoor sensors
-        outdoor_data = self.get_outdoor_sensor_data()
+        outdoor_data = f_outdoor.result()
         if outdoor_data:
             return outdoor_data
-        
+
         # Second priority: Estimate from soil sensors
-        soil_env = self.get_soil_environmental_data()
+        soil_env = f_soil.result()
         if soil_env:
-            print(f"🌱 Using soil sensor environmental data: {soil_env['estimated_air_temperature']}°C estimated from soil")
+            logger.debug("🌱 Using soil sensor environmental data: %s°C estimated from soil", soil_env['estimated_air_temperature'])
             return {
                 'temperature': soil_env['estimated_air_temperature'],
                 'humidity': 60,  # Default estimate
@@ -184,68 +538,28 @@ class WeatherMonitor:
                 }
             }
         
-        # Third priority: Free Open-Meteo Weather API (same as useOutdoorMode)
+        # Third priority: Free Open-Meteo Weather API (same as useOutdoorMode),
+        # memoized for five minutes - conditions don't change faster than that
+        return self._cached(('current', 49.2827, -123.1207), 300,
+                            self._fetch_open_meteo_current)
+
+    def _fetch_open_meteo_current(self):
+        """Fetch current conditions from Open-Meteo, mock data on failure."""
         try:
-            # Get coordinates for Vancouver, CA (or use default coordinates)
-            lat, lon = 49.2827, -123.1207  # Vancouver coordinates
-            
             # Use Open-Meteo API (completely free, no API key required)
-            weather_url = f"https://api.open-meteo.com/v1/forecast?latitude={lat}&longitude={lon}&current=temperature_2m,relative_humidity_2m,weather_code,wind_speed_10m,is_day&temperature_unit=celsius&wind_speed_unit=kmh&timezone=auto"
-            
-            response = requests.get(weather_url)
+            response = self.session.get(_OM_CURRENT_URL, timeout=(3, 5))
             response.raise_for_status()
-            
-            data = response.json()
-            
-            # Helper function to convert weather code to description
-            def get_weather_condition(code):
-                weather_codes = {
-                    0: 'clear sky',
-                    1: 'mainly clear',
-                    2: 'partly cloudy',
-                    3: 'overcast',
-                    45: 'fog',
-                    48: 'depositing rime fog',
-                    51: 'light drizzle',
-                    53: 'moderate drizzle',
-                    55: 'dense drizzle',
-                    61: 'slight rain',
-                    63: 'moderate rain',
-                    65: 'heavy rain',
-                    71: 'slight snow',
-                    73: 'moderate snow',
-                    75: 'heavy snow',
-                    80: 'slight rain showers',
-                    81: 'moderate rain showers',
-                    82: 'violent rain showers',
-                    95: 'thunderstorm',
-                    96: 'thunderstorm with slight hail',
-                    99: 'thunderstorm with heavy hail'
-                }
-                return weather_codes.get(code, f'weather condition {code}')
-            
-            def get_weather_main(code):
-                if code == 0 or code == 1:
-                    return 'Clear'
-                elif code in [2, 3]:
-                    return 'Clouds'
-                elif code in [61, 63, 65, 80, 81, 82]:
-                    return 'Rain'
-                elif code in [95, 96, 99]:
-                    return 'Thunderstorm'
-                elif code in [71, 73, 75]:
-                    return 'Snow'
-                else:
-                    return 'Clouds'
-            
+
+            data = orjson.loads(response.content) if orjson else response.json()
+
             current = data.get('current', {})
             weather_code = current.get('weather_code', 0)
-            
+
             weather_info = {
                 'temperature': round(current.get('temperature_2m', 20), 1),
                 'humidity': round(current.get('relative_humidity_2m', 60)),
-                'description': get_weather_condition(weather_code),
-                'main': get_weather_main(weather_code),
+                'description': _weather_condition(weather_code),
+                'main': _weather_main(weather_code),
                 'wind_speed': round(current.get('wind_speed_10m', 10), 1),
                 'visibility': 10,  # Not provided by Open-Meteo
                 'uv_index': 5,  # Would need separate UV API call
@@ -253,11 +567,11 @@ class WeatherMonitor:
                 'source': 'open_meteo_api'
             }
             
-            print(f"🌐 Using Open-Meteo weather API: {weather_info['temperature']}°C, {weather_info['description']}")
+            logger.debug("🌐 Using Open-Meteo weather API: %s°C, %s", weather_info['temperature'], weather_info['description'])
             return weather_info
                 
         except Exception as e:
-            print(f"❌ Error fetching weather data from Open-Meteo: {e}")
+            logger.error("❌ Error fetching weather data from Open-Meteo: %s", e)
             
             # Final fallback: Smart mock data with realistic variations
             return self._get_realistic_mock_weather_data()
@@ -266,43 +580,20 @@ class WeatherMonitor:
         """Get 5-day weather forecast using Open-Meteo API"""
         city = city or self.default_city
         country = country or self.default_country
-        
+
+        # A daily forecast is stable for much longer than current conditions
+        return self._cached(('forecast', 49.2827, -123.1207), 1800,
+                            self._fetch_open_meteo_forecast)
+
+    def _fetch_open_meteo_forecast(self):
+        """Fetch the 5-day forecast from Open-Meteo, mock data on failure."""
         try:
             # Use Open-Meteo forecast API (free, no API key required)
-            lat, lon = 49.2827, -123.1207  # Vancouver coordinates
-            
-            forecast_url = f"https://api.open-meteo.com/v1/forecast?latitude={lat}&longitude={lon}&daily=temperature_2m_max,temperature_2m_min,precipitation_probability_max,weather_code&temperature_unit=celsius&timezone=auto&forecast_days=5"
-            
-            response = requests.get(forecast_url)
+            response = self.session.get(_OM_FORECAST_URL, timeout=(3, 5))
             response.raise_for_status()
-            
-            data = response.json()
-            
-            def get_weather_condition(code):
-                weather_codes = {
-                    0: 'clear sky', 1: 'mainly clear', 2: 'partly cloudy', 3: 'overcast',
-                    45: 'fog', 48: 'depositing rime fog', 51: 'light drizzle', 53: 'moderate drizzle',
-                    55: 'dense drizzle', 61: 'slight rain', 63: 'moderate rain', 65: 'heavy rain',
-                    71: 'slight snow', 73: 'moderate snow', 75: 'heavy snow',
-                    80: 'slight rain showers', 81: 'moderate rain showers', 82: 'violent rain showers',
-                    95: 'thunderstorm', 96: 'thunderstorm with slight hail', 99: 'thunderstorm with heavy hail'
-                }
-                return weather_codes.get(code, f'weather condition {code}')
-            
-            def get_weather_main(code):
-                if code == 0 or code == 1:
-                    return 'Clear'
-                elif code in [2, 3]:
-                    return 'Clouds'
-                elif code in [61, 63, 65, 80, 81, 82]:
-                    return 'Rain'
-                elif code in [95, 96, 99]:
-                    return 'Thunderstorm'
-                elif code in [71, 73, 75]:
-                    return 'Snow'
-                else:
-                    return 'Clouds'
-            
+
+            data = orjson.loads(response.content) if orjson else response.json()
+
             daily = data.get('daily', {})
             forecast = []
             
@@ -317,58 +608,46 @@ class WeatherMonitor:
                     'datetime': times[i],
                     'temperature': round((temp_max[i] + temp_min[i]) / 2, 1) if i < len(temp_max) and i < len(temp_min) else 20,
                     'humidity': 60,  # Open-Meteo doesn't provide daily humidity in free tier
-                    'description': get_weather_condition(weather_codes[i] if i < len(weather_codes) else 0),
-                    'main': get_weather_main(weather_codes[i] if i < len(weather_codes) else 0),
+                    'description': _weather_condition(weather_codes[i] if i < len(weather_codes) else 0),
+                    'main': _weather_main(weather_codes[i] if i < len(weather_codes) else 0),
                     'precipitation': precip_prob[i] if i < len(precip_prob) else 0
                 })
             
-            print(f"🌐 Retrieved {len(forecast)} day forecast from Open-Meteo")
+            logger.debug("🌐 Retrieved %d day forecast from Open-Meteo", len(forecast))
             return forecast
             
         except Exception as e:
-            print(f"❌ Error fetching forecast data from Open-Meteo: {e}")
+            logger.error("❌ Error fetching forecast data from Open-Meteo: %s", e)
             return self._get_mock_forecast_data()
     
     def _get_realistic_mock_weather_data(self):
         """Enhanced mock weather data with realistic seasonal and time-based variations"""
-        import random
-        from datetime import datetime
-        
+        rng = self._rng
+
         # Get current time and season for realistic conditions
         now = datetime.now()
         hour = now.hour
-        month = now.month
-        
-        # Seasonal temperature ranges (Vancouver-like climate)
-        if month in [12, 1, 2]:  # Winter
-            base_temp = random.randint(2, 8)
-            conditions = ['overcast', 'light rain', 'partly cloudy', 'fog']
-        elif month in [3, 4, 5]:  # Spring
-            base_temp = random.randint(12, 18)
-            conditions = ['partly cloudy', 'light rain', 'overcast', 'mainly clear']
-        elif month in [6, 7, 8]:  # Summer
-            base_temp = random.randint(20, 28)
-            conditions = ['clear sky', 'mainly clear', 'partly cloudy']
-        else:  # Fall
-            base_temp = random.randint(8, 16)
-            conditions = ['overcast', 'light rain', 'partly cloudy', 'fog']
-        
+        season = _SEASON[now.month - 1]
+
+        base_temp = rng.randint(*_SEASON_TEMP[season])
+        conditions = _SEASON_CONDS[season]
+
         # Daily temperature variation (cooler at night)
         if 6 <= hour <= 18:  # Daytime
-            temp_adjustment = random.randint(0, 4)
+            temp_adjustment = rng.randint(0, 4)
         else:  # Nighttime
-            temp_adjustment = random.randint(-4, 0)
-        
+            temp_adjustment = rng.randint(-4, 0)
+
         final_temp = base_temp + temp_adjustment
-        condition = random.choice(conditions)
-        
+        condition = rng.choice(conditions)
+
         # Humidity based on season and weather
         if 'rain' in condition or 'fog' in condition:
-            humidity = random.randint(80, 95)
+            humidity = rng.randint(80, 95)
         elif 'clear' in condition:
-            humidity = random.randint(40, 70)
+            humidity = rng.randint(40, 70)
         else:
-            humidity = random.randint(60, 80)
+            humidity = rng.randint(60, 80)
         
         # Main weather type based on condition
         if 'clear' in condition:
@@ -385,184 +664,79 @@ class WeatherMonitor:
             'humidity': humidity,
             'description': condition,
             'main': main,
-            'wind_speed': random.randint(5, 25),
-            'visibility': random.randint(5, 15),
-            'uv_index': random.randint(1, 8) if 6 <= hour <= 18 and 'clear' in condition else random.randint(1, 4),
+            'wind_speed': rng.randint(5, 25),
+            'visibility': rng.randint(5, 15),
+            'uv_index': rng.randint(1, 8) if 6 <= hour <= 18 and 'clear' in condition else rng.randint(1, 4),
             'timestamp': now.isoformat(),
             'source': 'realistic_mock'
         }
     
     def _get_mock_forecast_data(self):
         """Mock forecast data for demo purposes"""
-        import random
-        from datetime import datetime, timedelta
-        
+        rng = self._rng
         forecast = []
         base_time = datetime.now()
-        
+
         for i in range(8):
-            time = base_time + timedelta(hours=i*3)
-            condition = random.choice(['Clear', 'Rain', 'Clouds', 'Sun'])
-            
+            slot = base_time + timedelta(hours=i*3)
+            condition = rng.choice(('Clear', 'Rain', 'Clouds', 'Sun'))
+
             forecast.append({
-                'datetime': time.strftime('%Y-%m-%d %H:%M:%S'),
-                'temperature': random.randint(15, 35),
-                'humidity': random.randint(30, 90),
+                'datetime': slot.strftime('%Y-%m-%d %H:%M:%S'),
+                'temperature': rng.randint(15, 35),
+                'humidity': rng.randint(30, 90),
                 'description': f"{condition.lower()} conditions",
                 'main': condition,
-                'precipitation': random.randint(0, 10) if condition == 'Rain' else 0
+                'precipitation': rng.randint(0, 10) if condition == 'Rain' else 0
             })
         
         return forecast
     
-    def check_weather_alerts(self, user_email, weather_data=None):
+    def check_weather_alerts(self, user_email, weather_data=None, forecast=None):
         """Check if weather conditions require alerts and include soil context"""
-        alerts = []
-        
         if not weather_data:
             weather_data = self.get_current_weather()
-        
+
         # Get soil context for enhanced recommendations
         soil_context = self.get_soil_environmental_data()
-        
-        # Check for extreme heat/sun
-        if weather_data['temperature'] > 30 and weather_data['main'] in ['Clear', 'Sun']:
-            recommendations = [
-                "Provide shade for sensitive plants",
-                "Increase watering frequency", 
-                "Water early morning or late evening",
-                "Mulch around plants to retain moisture"
-            ]
-            
-            # Add soil-specific recommendations
-            if soil_context and soil_context['soil_moisture'] < 40:
-                recommendations.extend([
-                    f"⚠️ Soil moisture is low ({soil_context['soil_moisture']}%) - increase irrigation immediately",
-                    "Consider drip irrigation for consistent moisture"
-                ])
-            
-            alerts.append({
-                'type': 'extreme_heat',
-                'severity': 'high' if weather_data['temperature'] > 35 else 'medium',
-                'message': f"⚠️ Extreme heat warning! Temperature: {weather_data['temperature']}°C. Protect your plants from intense sunlight.",
-                'recommendations': recommendations
-            })
-        
-        # Check for rain/storms
-        if weather_data['main'] in ['Rain', 'Thunderstorm'] or 'rain' in weather_data['description'].lower():
-            forecast = self.get_weather_forecast()
-            heavy_rain_hours = sum(1 for f in forecast if f['precipitation'] > 5)
-            
-            recommendations = [
-                "Move potted plants under cover",
-                "Ensure proper drainage in garden beds",
-                "Reduce watering schedule",
-                "Secure plant supports and stakes"
-            ]
-            
-            # Add soil-specific recommendations
-            if soil_context and soil_context['soil_moisture'] > 70:
-                recommendations.extend([
-                    f"⚠️ Soil is already saturated ({soil_context['soil_moisture']}%) - improve drainage urgently",
-                    "Consider raised beds or adding sand to heavy soils"
-                ])
-            
-            alerts.append({
-                'type': 'rain_warning',
-                'severity': 'high' if heavy_rain_hours > 3 else 'medium',
-                'message': f"🌧️ Rain expected! Current conditions: {weather_data['description']}. Heavy rain forecasted for {heavy_rain_hours} periods.",
-                'recommendations': recommendations
-            })
-        
-        # Check for high UV/intense sun
-        if weather_data.get('uv_index') and weather_data['uv_index'] > 8:
-            alerts.append({
-                'type': 'high_uv',
-                'severity': 'medium',
-                'message': f"☀️ High UV index ({weather_data['uv_index']})! Plants may need protection from intense sunlight.",
-                'recommendations': [
-                    "Use shade cloth for delicate plants",
-                    "Water more frequently",
-                    "Consider afternoon shade"
-                ]
-            })
-        
-        # Check for low humidity + high temp
-        if weather_data['humidity'] < 30 and weather_data['temperature'] > 25:
-            recommendations = [
-                "Increase humidity around plants",
-                "Water more frequently",
-                "Group plants together",
-                "Use humidity trays"
-            ]
-            
-            # Add soil moisture context
-            if soil_context:
-                if soil_context['soil_moisture'] < 30:
-                    recommendations.insert(0, f"🚨 Critical: Both air and soil are very dry! Soil moisture: {soil_context['soil_moisture']}%")
-                elif soil_context['soil_moisture'] < 50:
-                    recommendations.insert(0, f"⚠️ Soil moisture is getting low: {soil_context['soil_moisture']}%")
-            
-            alerts.append({
-                'type': 'dry_conditions',
-                'severity': 'high' if (soil_context and soil_context['soil_moisture'] < 30) else 'medium',
-                'message': f"🌵 Very dry conditions! Humidity: {weather_data['humidity']}%, Temperature: {weather_data['temperature']}°C",
-                'recommendations': recommendations
-            })
-        
-        # New alert: Soil-based weather warnings
-        if soil_context:
-            soil_temp = soil_context['soil_temperature']
-            soil_moisture = soil_context['soil_moisture']
-            
-            # Soil temperature too high
-            if soil_temp > 28:
-                alerts.append({
-                    'type': 'soil_overheating',
-                    'severity': 'high',
-                    'message': f"🌡️ Soil overheating! Soil temperature: {soil_temp}°C. Root damage possible.",
-                    'recommendations': [
-                        "Apply thick mulch immediately",
-                        "Increase watering to cool soil",
-                        "Provide shade over soil area",
-                        "Water in early morning to pre-cool soil"
-                    ]
-                })
-            
-            # Soil moisture critical
-            if soil_moisture < 20:
-                alerts.append({
-                    'type': 'soil_drought',
-                    'severity': 'high',
-                    'message': f"🚨 Soil drought emergency! Moisture: {soil_moisture}%. Plants in distress.",
-                    'recommendations': [
-                        "Water immediately and deeply",
-                        "Check irrigation system",
-                        "Add water-retaining mulch",
-                        "Consider emergency watering schedule"
-                    ]
-                })
-            elif soil_moisture > 85:
-                alerts.append({
-                    'type': 'soil_waterlogged',
-                    'severity': 'high', 
-                    'message': f"💧 Soil waterlogged! Moisture: {soil_moisture}%. Root rot risk.",
-                    'recommendations': [
-                        "Stop watering immediately",
-                        "Improve drainage",
-                        "Check for blocked drains",
-                        "Consider temporary raised planting"
-                    ]
-                })
-        
+
+        # Context dict built once; the rule table reads from it
+        ctx = {
+            'temp': weather_data['temperature'],
+            'main': weather_data['main'],
+            'humidity': weather_data['humidity'],
+            'description': weather_data['description'],
+            'desc_lower': weather_data['description'].lower(),
+            'uv': weather_data.get('uv_index'),
+            'soil_moisture': soil_context['soil_moisture'] if soil_context else None,
+            'soil_temp': soil_context['soil_temperature'] if soil_context else None,
+            # Lazy: only the rain rule pulls the forecast, and callers that
+            # already have one pass it in to avoid a second fetch
+            'forecast': self.get_weather_forecast if forecast is None else (lambda: forecast),
+        }
+
+        alerts = []
+        for predicate, builder in _ALERT_RULES:
+            if predicate(ctx):
+                alert = builder(ctx)
+                post = _SOIL_POSTPROCESSORS.get(alert['type'])
+                if post is not None:
+                    post(alert, ctx)
+                alerts.append(alert)
+
         return alerts
     
     def get_weather_summary(self):
         """Get a comprehensive summary of weather, soil, and alerts"""
+        # Soil context and the forecast overlap with the current-weather
+        # fetch; the session's keep-alive pool carries both API calls over
+        # warm connections
+        f_soil = self._exec.submit(self.get_soil_environmental_data)
+        f_forecast = self._exec.submit(self.get_weather_forecast)
         current = self.get_current_weather()
-        forecast = self.get_weather_forecast()
-        alerts = self.check_weather_alerts(None, current)
-        soil_context = self.get_soil_environmental_data()
+        forecast = f_forecast.result()
+        alerts = self.check_weather_alerts(None, current, forecast=forecast)
+        soil_context = f_soil.result()
         
         # Create comprehensive summary
         summary_parts = [f"Weather: {current['temperature']}°C, {current['description']}"]
@@ -6,5 +6,9 @@ cd "$(dirname "$0")/Backend"
 lsof -ti:5001 | xargs kill -9 2>/dev/null || true
 
 # Use absolute paths that we know work
-echo "🚀 Starting Flask backend server..."
-/Users/rajesh/Desktop/MIT/Backend/venv/bin/python /Users/rajesh/Desktop/MIT/Backend/app.py
\ No newline at end of file
+echo "🚀 Starting Flask backend server (gunicorn)..."
+/Users/rajesh/Desktop/MIT/Backend/venv/bin/gunicorn \
+    --chdir /Users/rajesh/Desktop/MIT/Backend \
+    --workers 1 --threads 8 \
+    --bind 0.0.0.0:5001 \
+    app:app
\ No newline at end of file